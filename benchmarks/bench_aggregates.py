@@ -0,0 +1,47 @@
+"""Compares season stats from the aggregate index against rescanning every game
+
+Running:
+- `python3 -m benchmarks.bench_aggregates [ngames]`
+
+"""
+import sys
+import heapq
+from collections import defaultdict
+
+from lol_updater import aggregates
+from lol_updater import parsers
+
+from . import common
+from .generator import SeasonGenerator
+
+NGAMES = 20000
+QUERIES = 100
+
+
+def rescan(games, league: str, split: str):
+    kills = defaultdict(int)
+    for game in games:
+        if game.league == league and game.split == split:
+            for playergame in game.playergames:
+                kills[playergame.player.playerid] += playergame.kills
+    return heapq.nlargest(10, kills.items(), key=lambda item: item[1])
+
+
+def main(ngames: int):
+    games = list(parsers.GameIterator(SeasonGenerator(ngames)))
+    index = aggregates.AggregateIndex()
+    seconds, _ = common.timed(index.update, games)
+    print('indexed {:,} games in {:.3f}s ({:,.0f} games/sec)'.format(ngames, seconds, ngames / seconds))
+    league, split = games[0].league, games[0].split
+    scan, _ = common.timed(lambda: [rescan(games, league, split) for _ in range(QUERIES)])
+    lookup, _ = common.timed(lambda: [index.player_leaders('kills', league, split) for _ in range(QUERIES)])
+    playerid = games[0].playergames[0].player.playerid
+    single, _ = common.timed(lambda: [index.player(playerid, league, split) for _ in range(QUERIES)])
+    print('{:<24} {:>14}'.format('query', 'ms/query'))
+    print('{:<24} {:>14.3f}'.format('rescan top 10', scan / QUERIES * 1000))
+    print('{:<24} {:>14.3f}'.format('index top 10', lookup / QUERIES * 1000))
+    print('{:<24} {:>14.4f}'.format('index one player', single / QUERIES * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,62 @@
+"""Compression ratio, write speed and read throughput of each codec and level
+
+Running:
+- `python3 -m benchmarks.bench_compression [ngames]`
+
+"""
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import compression
+from lol_updater import iterfactory
+
+from . import common
+from .generator import SeasonGenerator
+
+NGAMES = 10000
+MB = 1024 * 1024
+LEVELS = (
+    (None, None),
+    (compression.GZIP, 1),
+    (compression.GZIP, 6),
+    (compression.GZIP, 9),
+    (compression.BZIP2, 9),
+    (compression.XZ, 0),
+    (compression.XZ, 6),
+    (compression.ZSTD, 1),
+    (compression.ZSTD, 3),
+    (compression.ZSTD, 9),
+    (compression.ZSTD, 19),
+)
+
+
+def write(path: Path, text: str, codec: str, level: int):
+    with compression.open_output(path, compression=codec, level=level) as foutput:
+        foutput.write(text)
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = SeasonGenerator(ngames).write(Path(tmpdir, 'season.csv'))
+        text = source.read_text()
+        size = len(text.encode())
+        print('{} games, {:.1f} MB of csv'.format(ngames, size / MB))
+        print('{:<10} {:>6} {:>8} {:>12} {:>12} {:>12}'.format(
+            'codec', 'level', 'ratio', 'write MB/s', 'lines MB/s', 'games/sec'))
+        for codec, level in LEVELS:
+            if codec == compression.ZSTD and compression.zstandard is None:
+                continue
+            path = Path(tmpdir, 'out')
+            write_seconds, _ = common.timed(write, path, text, codec, level)
+            lines_seconds, _ = common.timed(common.consume, compression.lines(path))
+            games_seconds, _ = common.timed(
+                common.consume, iterfactory.csv_file_game_iterator(datetime.min, path))
+            print('{:<10} {:>6} {:>8.1f} {:>12,.1f} {:>12,.1f} {:>12,.0f}'.format(
+                codec or 'none', '-' if level is None else level, size / path.stat().st_size,
+                size / MB / write_seconds, size / MB / lines_seconds, ngames / games_seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
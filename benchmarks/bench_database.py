@@ -0,0 +1,44 @@
+"""Measures rows/sec loading games into a local sqlite file, batched and row by row
+
+Running:
+- `python3 -m benchmarks.bench_database [ngames]`
+
+"""
+import sys
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import database
+from lol_updater import iterfactory
+
+from . import common
+
+NGAMES = 5000
+
+
+def load(path: Path, games, batch_size: int) -> int:
+    connection = sqlite3.connect(path)
+    try:
+        backend = database.SqliteBackend(connection)
+        backend.create_tables()
+        return sum(database.Loader(backend, batch_size).load(games).values())
+    finally:
+        connection.close()
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        with open(path, 'r', newline='') as finput:
+            games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+        print('{:<12} {:>12}'.format('batch size', 'rows/sec'))
+        for batch_size in (1, 100, database.BATCH_SIZE):
+            db_path = Path(tmpdir, f'games_{batch_size}.db')
+            seconds, rows = common.timed(load, db_path, games, batch_size)
+            print('{:<12} {:>12,.0f}'.format(batch_size, rows / seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,65 @@
+"""Compares peak memory and throughput of the buffered and streaming download paths
+
+Each measurement runs in a fresh interpreter so that ru_maxrss reflects only that download.
+
+Running:
+- `python3 -m benchmarks.bench_download [ngames ...]`
+
+"""
+import csv
+import sys
+import json
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+
+from lol_updater import locator
+from lol_updater import testing
+
+from . import common
+
+SIZES = (1000, 5000, 20000)
+
+
+def measure(mode: str, url: str):
+    seconds, rows = common.timed(
+        common.consume,
+        csv.DictReader(locator.download_games(url, stream=mode == 'stream'))
+    )
+    print(json.dumps(dict(
+        rows=rows,
+        seconds=seconds,
+        maxrss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )))
+
+
+def run(mode: str, url: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_download', '--measure', mode, url],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def main(sizes):
+    print('{:>8} {:>9} {:>7} {:>12} {:>12}'.format('games', 'size MB', 'mode', 'rows/sec', 'peak RSS MB'))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with testing.serve_directory(Path(tmpdir)) as base_url:
+            for ngames in sizes:
+                path = common.scale_games_csv(Path(tmpdir, f'{ngames}.csv'), ngames)
+                size = path.stat().st_size / (1024 * 1024)
+                for mode in ('buffered', 'stream'):
+                    result = run(mode, f'{base_url}/{path.name}')
+                    print('{:>8} {:>9.1f} {:>7} {:>12,.0f} {:>12.1f}'.format(
+                        ngames, size, mode,
+                        result['rows'] / result['seconds'],
+                        result['maxrss_mb']
+                    ))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,64 @@
+"""Measures GameIterator throughput against parsing every row into its own Game
+
+Running:
+- `python3 -m benchmarks.bench_game_iterator [ngames]`
+
+"""
+import csv
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterfactory
+from lol_updater import parsers
+
+from . import common
+
+NGAMES = 10000
+
+
+def row_by_row(rows):
+    '''
+    How games were assembled before: every row parsed into a Game and merged into the current one
+    '''
+    current = None
+    for row in rows:
+        game = parsers.Game.from_row(row)
+        if current is None:
+            current = game
+        elif game.gameid == current.gameid:
+            current.playergames.extend(game.playergames)
+            current.teamgames.extend(game.teamgames)
+        else:
+            yield current
+            current = game
+    if current is not None:
+        yield current
+
+
+def from_file(path: Path):
+    with open(path, 'r', newline='') as finput:
+        yield from iterfactory.csv_game_iterator(datetime.min, finput)
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        with open(path, 'r', newline='') as finput:
+            rows = list(csv.DictReader(finput))
+        print('{:<28} {:>12} {:>12}'.format('path', 'rows/sec', 'games/sec'))
+        cases = (
+            ('row by row (in memory)', lambda: row_by_row(rows)),
+            ('GameIterator (in memory)', lambda: parsers.GameIterator(rows)),
+            ('csv_game_iterator (file)', lambda: from_file(path)),
+        )
+        for name, make in cases:
+            parsers.parse_dt.cache_clear()
+            seconds, count = common.timed(common.consume, make())
+            assert count == ngames
+            print('{:<28} {:>12,.0f} {:>12,.0f}'.format(name, len(rows) / seconds, count / seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
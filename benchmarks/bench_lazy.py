@@ -0,0 +1,47 @@
+"""Compares eager Games with LazyGames when only the game level columns and the winner are used
+
+Running:
+- `python3 -m benchmarks.bench_lazy [ngames]`
+
+"""
+import sys
+
+from lol_updater import parsers
+
+from . import common
+from .generator import SeasonGenerator
+
+NGAMES = 20000
+
+
+def winners(rows, lazy: bool):
+    wins = {}
+    for game in parsers.GameIterator(rows, lazy=lazy):
+        if game.league == 'LCK':
+            team = game.winner
+            wins[team.teamid] = wins.get(team.teamid, 0) + 1
+    return wins
+
+
+def full(rows, lazy: bool):
+    return sum(
+        playergame.kills for game in parsers.GameIterator(rows, lazy=lazy) for playergame in game.playergames
+    )
+
+
+def main(ngames: int):
+    rows = [
+        {column: row[column] for column in parsers.COLUMNS} for row in SeasonGenerator(ngames)
+    ]
+    print('{:<28} {:>12} {:>12} {:>9}'.format('workload', 'eager g/s', 'lazy g/s', 'speedup'))
+    for name, fn in (('league filter + winner', winners), ('every player stat', full)):
+        parsers.parse_dt.cache_clear()
+        eager, expected = common.timed(fn, rows, False)
+        parsers.parse_dt.cache_clear()
+        lazy, result = common.timed(fn, rows, True)
+        assert result == expected
+        print('{:<28} {:>12,.0f} {:>12,.0f} {:>8.1f}x'.format(name, ngames / eager, ngames / lazy, eager / lazy))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
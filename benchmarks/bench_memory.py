@@ -0,0 +1,45 @@
+"""Reports the memory held per parsed game, with and without a parsers.Registry
+
+Running:
+- `python3 -m benchmarks.bench_memory [ngames]`
+
+"""
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterfactory
+from lol_updater import parsers
+
+from . import common
+
+NGAMES = 5000
+
+
+def bytes_per_game(path: Path, registry: parsers.Registry = None) -> float:
+    parsers.parse_dt.cache_clear()
+    tracemalloc.start()
+    try:
+        with open(path, 'r', newline='') as finput:
+            games = list(iterfactory.csv_game_iterator(datetime.min, finput, registry))
+        # everything still allocated is held by the games (and the registry)
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return used / len(games)
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        plain = bytes_per_game(path)
+        interned = bytes_per_game(path, parsers.Registry())
+    print('{:<12} {:>14}'.format('mode', 'bytes/game'))
+    print('{:<12} {:>14,.0f}'.format('plain', plain))
+    print('{:<12} {:>14,.0f}'.format('registry', interned))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,45 @@
+"""Measures ParallelGameIterator throughput for 1..N worker processes
+
+Running:
+- `python3 -m benchmarks.bench_parallel [ngames] [max workers]`
+
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterfactory
+
+from . import common
+
+NGAMES = 20000
+
+
+def serial(path: Path):
+    with open(path, 'r', newline='') as finput:
+        yield from iterfactory.csv_game_iterator(datetime.min, finput)
+
+
+def main(ngames: int, max_workers: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        seconds, count = common.timed(common.consume, serial(path))
+        print('{:<10} {:>12} {:>10}'.format('workers', 'games/sec', 'speedup'))
+        print('{:<10} {:>12,.0f} {:>10}'.format('serial', count / seconds, '1.0x'))
+        baseline = seconds
+        workers = 1
+        while workers <= max_workers:
+            seconds, count = common.timed(
+                common.consume, iterfactory.csv_parallel_game_iterator(datetime.min, path, workers))
+            assert count == ngames
+            print('{:<10} {:>12,.0f} {:>9.1f}x'.format(workers, count / seconds, baseline / seconds))
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES,
+        int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    )
@@ -0,0 +1,46 @@
+"""Compares parsers.parse_dt against the strptime loop it replaced
+
+Running:
+- `python3 -m benchmarks.bench_parse_dt [count]`
+
+"""
+import sys
+from datetime import timedelta
+
+from lol_updater import parsers
+
+from . import common
+
+COUNT = 100000
+# rows of a game share its date
+ROWS_PER_GAME = 12
+
+
+def make_values(count: int, fmt: str, repeat: int):
+    return [
+        (common.EPOCH + timedelta(minutes=i // repeat)).strftime(fmt) for i in range(count)
+    ]
+
+
+def run(fn, values) -> float:
+    seconds, _ = common.timed(lambda: [fn(value) for value in values])
+    return seconds
+
+
+def main(count: int):
+    cases = (
+        ('input format, distinct', parsers.INPUT_DT_FORMAT, 1),
+        ('ea format, distinct', parsers.EA_DT_FORMAT, 1),
+        ('ea format, per game', parsers.EA_DT_FORMAT, ROWS_PER_GAME),
+    )
+    print('{:<24} {:>14} {:>14} {:>8}'.format('case', 'strptime/sec', 'parse_dt/sec', 'speedup'))
+    for name, fmt, repeat in cases:
+        values = make_values(count, fmt, repeat)
+        parsers.parse_dt.cache_clear()
+        old = run(parsers.parse_dt_strptime, values)
+        new = run(parsers.parse_dt, values)
+        print('{:<24} {:>14,.0f} {:>14,.0f} {:>7.1f}x'.format(name, count / old, count / new, old / new))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else COUNT)
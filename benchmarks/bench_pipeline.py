@@ -0,0 +1,59 @@
+"""Compares a daily update (download, parse, load into sqlite) run as one generator chain
+and as a pipeline of threads, and shows where each pipeline stage spent its time
+
+Running:
+- `python3 -m benchmarks.bench_pipeline [ngames]`
+
+"""
+import sys
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import database
+from lol_updater import iterfactory
+from lol_updater import locator
+from lol_updater import pipeline
+from lol_updater import testing
+
+from . import common
+
+NGAMES = 5000
+
+
+def make_loader(path: Path) -> database.Loader:
+    backend = database.SqliteBackend(sqlite3.connect(path, check_same_thread=False))
+    backend.create_tables()
+    return database.Loader(backend)
+
+
+def serial(url: str, loader: database.Loader):
+    for game in iterfactory.csv_game_iterator(datetime.min, locator.stream_games(url)):
+        loader.add(game)
+    loader.flush()
+
+
+def pipelined(url: str, loader: database.Loader) -> pipeline.Pipeline:
+    games = pipeline.game_pipeline(datetime.min, locator.stream_games(url), write=loader.add)
+    games.run()
+    loader.flush()
+    return games
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        with testing.serve_directory(Path(tmpdir)) as base_url:
+            url = f'{base_url}/{path.name}'
+            serial_seconds, _ = common.timed(serial, url, make_loader(Path(tmpdir, 'serial.db')))
+            pipeline_seconds, games = common.timed(pipelined, url, make_loader(Path(tmpdir, 'pipeline.db')))
+    print('serial chain: {:.2f}s  pipeline: {:.2f}s'.format(serial_seconds, pipeline_seconds))
+    print('{:<10} {:>10} {:>9} {:>9} {:>9}'.format('stage', 'items', 'busy s', 'starved s', 'blocked s'))
+    for stats in games.stats:
+        print('{:<10} {:>10,} {:>9.2f} {:>9.2f} {:>9.2f}'.format(
+            stats.name, stats.items, stats.busy, stats.starved, stats.blocked))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
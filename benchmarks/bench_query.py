@@ -0,0 +1,53 @@
+"""Compares GameIndex queries against filtering a list of games
+
+Running:
+- `python3 -m benchmarks.bench_query [ngames]`
+
+"""
+import sys
+from datetime import timedelta
+
+from lol_updater import parsers
+from lol_updater import query
+
+from . import common
+from .generator import SeasonGenerator
+
+NGAMES = 50000
+REPEAT = 20
+
+
+def scan(games, league=None, split=None, playoffs=None, team=None, start=None):
+    return [
+        game for game in games
+        if (league is None or game.league == league)
+        and (split is None or game.split == split)
+        and (playoffs is None or game.playoffs == playoffs)
+        and (team is None or any(t.team.teamid == team for t in game.teamgames))
+        and (start is None or game.date >= start)
+    ]
+
+
+def main(ngames: int):
+    games = list(parsers.GameIterator(SeasonGenerator(ngames)))
+    seconds, index = common.timed(query.GameIndex, games)
+    print('indexed {:,} games in {:.3f}s ({:,.0f} games/sec)'.format(ngames, seconds, ngames / seconds))
+    game = games[ngames // 2]
+    team = game.teamgames[0].team.teamid
+    cases = (
+        ('league', dict(league=game.league)),
+        ('league, playoffs, team', dict(league=game.league, playoffs=True, team=team)),
+        ('team, split, since', dict(team=team, split=game.split, start=game.date)),
+        ('last week', dict(start=games[-1].date - timedelta(days=7))),
+    )
+    print('{:<24} {:>8} {:>12} {:>12} {:>9}'.format('query', 'games', 'scan ms', 'index ms', 'speedup'))
+    for name, filters in cases:
+        scanned, expected = common.timed(lambda: [scan(games, **filters) for _ in range(REPEAT)])
+        indexed, results = common.timed(lambda: [list(index.query(**filters)) for _ in range(REPEAT)])
+        assert len(results[0]) == len(expected[0])
+        print('{:<24} {:>8,} {:>12.3f} {:>12.3f} {:>8.0f}x'.format(
+            name, len(results[0]), scanned / REPEAT * 1000, indexed / REPEAT * 1000, scanned / indexed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,65 @@
+"""Compares csv.DictReader with iterators.Columns: rows/sec, memory per row and games/sec
+
+Running:
+- `python3 -m benchmarks.bench_reader [ngames]`
+
+"""
+import csv
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterators
+from lol_updater import parsers
+
+from . import common
+
+NGAMES = 5000
+# rows kept alive to measure the memory each one holds
+SAMPLE = 1000
+
+
+def dict_reader(lines):
+    return csv.DictReader(lines)
+
+
+def columns_reader(lines):
+    return iterators.Columns(csv.reader(lines), parsers.COLUMNS)
+
+
+def bytes_per_row(make_reader, lines) -> float:
+    tracemalloc.start()
+    try:
+        rows = []
+        for row in make_reader(lines):
+            rows.append(row)
+            if len(rows) == SAMPLE:
+                break
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return used / len(rows)
+
+
+def games(make_reader, lines):
+    return parsers.GameIterator(iterators.Latest(datetime.min, make_reader(lines), parsers.parse_dt))
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        with open(path, 'r', newline='') as finput:
+            lines = finput.readlines()
+    print('{:<12} {:>12} {:>12} {:>12}'.format('reader', 'rows/sec', 'bytes/row', 'games/sec'))
+    for name, make_reader in (('DictReader', dict_reader), ('Columns', columns_reader)):
+        seconds, rows = common.timed(common.consume, make_reader(lines))
+        parsers.parse_dt.cache_clear()
+        game_seconds, count = common.timed(common.consume, games(make_reader, lines))
+        print('{:<12} {:>12,.0f} {:>12,.0f} {:>12,.0f}'.format(
+            name, rows / seconds, bytes_per_row(make_reader, lines), count / game_seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
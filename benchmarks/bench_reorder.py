@@ -0,0 +1,62 @@
+"""Compares GameIterator with ReorderingGameIterator on contiguous and interleaved rows
+
+Running:
+- `python3 -m benchmarks.bench_reorder [ngames]`
+
+"""
+import sys
+import random
+import tracemalloc
+from typing import Dict, List
+
+from lol_updater import parsers
+
+from . import common
+from .generator import SeasonGenerator
+from .suite import ROWS_PER_GAME
+
+NGAMES = 20000
+# games whose rows are shuffled together
+INTERLEAVE = 8
+
+
+def interleave(rows: List[Dict], games: int) -> List[Dict]:
+    rng = random.Random(0)
+    block = games * ROWS_PER_GAME
+    shuffled = []
+    for start in range(0, len(rows), block):
+        chunk = rows[start:start + block]
+        rng.shuffle(chunk)
+        shuffled.extend(chunk)
+    return shuffled
+
+
+def peak(make_iterator, rows) -> int:
+    tracemalloc.start()
+    try:
+        for _ in make_iterator(rows):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(ngames: int):
+    rows = list(SeasonGenerator(ngames))
+    shuffled = interleave(rows, INTERLEAVE)
+    cases = (
+        ('GameIterator, contiguous', parsers.GameIterator, rows),
+        ('Reordering, contiguous', parsers.ReorderingGameIterator, rows),
+        ('Reordering, interleaved', parsers.ReorderingGameIterator, shuffled),
+        ('GameIterator, interleaved', parsers.GameIterator, shuffled),
+    )
+    print('{:<28} {:>12} {:>10} {:>12}'.format('case', 'games/sec', 'games', 'peak KiB'))
+    for name, make_iterator, items in cases:
+        parsers.parse_dt.cache_clear()
+        seconds, count = common.timed(common.consume, make_iterator(items))
+        print('{:<28} {:>12,.0f} {:>10,} {:>12,.0f}'.format(
+            name, ngames / seconds, count, peak(make_iterator, items[:ROWS_PER_GAME * 1000]) / 1024))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,52 @@
+"""Compares the json lines encoder/decoder with json.dumps(as_dict()) and from_dict(json.loads())
+
+Running:
+- `python3 -m benchmarks.bench_serializers [ngames]`
+
+"""
+import io
+import sys
+import json
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterfactory
+from lol_updater import parsers
+from lol_updater import serializers
+
+from . import common
+
+NGAMES = 5000
+
+
+def encode_as_dict(games, output):
+    for game in games:
+        output.write(json.dumps(game.as_dict()))
+        output.write('\n')
+
+
+def decode_from_dict(input):
+    return [parsers.Game.from_dict(json.loads(line)) for line in input]
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        with open(path, 'r', newline='') as finput:
+            games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+    old_output = io.StringIO()
+    new_output = io.StringIO()
+    old_encode, _ = common.timed(encode_as_dict, games, old_output)
+    new_encode, _ = common.timed(serializers.write_games, games, new_output)
+    assert old_output.getvalue() == new_output.getvalue()
+    lines = new_output.getvalue().splitlines()
+    old_decode, _ = common.timed(decode_from_dict, lines)
+    new_decode, _ = common.timed(lambda: list(serializers.read_games(lines)))
+    print('{:<8} {:>14} {:>14} {:>8}'.format('step', 'as_dict g/s', 'jsonl g/s', 'speedup'))
+    for name, old, new in (('encode', old_encode, new_encode), ('decode', old_decode, new_decode)):
+        print('{:<8} {:>14,.0f} {:>14,.0f} {:>7.1f}x'.format(name, ngames / old, ngames / new, old / new))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,62 @@
+"""Compares routing games to per-league sinks on one thread against ShardedWriter
+
+Running:
+- `python3 -m benchmarks.bench_sharding [ngames]`
+
+"""
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+from lol_updater import parsers
+from lol_updater import sharding
+
+from . import common
+from .generator import SeasonGenerator
+
+NGAMES = 20000
+# round trip of a remote sink (a database insert, a message queue) per game
+LATENCY = 0.0002
+
+
+class SlowSink:
+
+    def write(self, game):
+        time.sleep(LATENCY)
+
+    def close(self):
+        pass
+
+
+def sequential(games, make_sink):
+    sinks = {}
+    for game in games:
+        sink = sinks.get(game.league)
+        if sink is None:
+            sink = sinks[game.league] = make_sink(game.league)
+        sink.write(game)
+    for sink in sinks.values():
+        sink.close()
+
+
+def sharded(games, make_sink):
+    sharding.ShardedWriter(make_sink).run(games)
+
+
+def main(ngames: int):
+    games = list(parsers.GameIterator(SeasonGenerator(ngames)))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cases = (
+            ('gzip json lines', lambda league: sharding.JsonLinesSink(Path(tmpdir, f'{league}.jsonl.gz'), level=6)),
+            ('remote sink', lambda league: SlowSink()),
+        )
+        print('{:<18} {:>16} {:>16} {:>9}'.format('sink', 'one thread g/s', 'sharded g/s', 'speedup'))
+        for name, make_sink in cases:
+            one, _ = common.timed(sequential, games, make_sink)
+            many, _ = common.timed(sharded, games, make_sink)
+            print('{:<18} {:>16,.0f} {:>16,.0f} {:>8.1f}x'.format(name, ngames / one, ngames / many, one / many))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,74 @@
+"""Compares cold start (load and look up one game) from csv, json and a snapshot
+
+Each measurement runs in a fresh interpreter.
+
+Running:
+- `python3 -m benchmarks.bench_snapshot [ngames]`
+
+"""
+import sys
+import json
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterfactory
+from lol_updater import parsers
+from lol_updater import snapshot
+
+from . import common
+
+NGAMES = 10000
+
+
+def load_csv(path: str, gameid: str) -> parsers.Game:
+    with open(path, 'r', newline='') as finput:
+        games = {game.gameid: game for game in iterfactory.csv_game_iterator(datetime.min, finput)}
+    return games[gameid]
+
+
+def load_json(path: str, gameid: str) -> parsers.Game:
+    with open(path, 'r') as finput:
+        games = {data['gameid']: parsers.Game.from_dict(data) for data in json.load(finput)}
+    return games[gameid]
+
+
+def load_snapshot(path: str, gameid: str) -> parsers.Game:
+    return snapshot.Snapshot(path).get(gameid)
+
+
+LOADERS = dict(csv=load_csv, json=load_json, snapshot=load_snapshot)
+
+
+def measure(kind: str, path: str, gameid: str):
+    seconds, game = common.timed(LOADERS[kind], path, gameid)
+    assert game.gameid == gameid
+    print(seconds)
+
+
+def main(ngames: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = common.scale_games_csv(Path(tmpdir, 'games.csv'), ngames)
+        with open(csv_path, 'r', newline='') as finput:
+            games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+        paths = dict(csv=csv_path, json=Path(tmpdir, 'games.json'), snapshot=Path(tmpdir, 'games.snap'))
+        with open(paths['json'], 'w') as foutput:
+            json.dump([game.as_dict() for game in games], foutput)
+        snapshot.write_snapshot(games, paths['snapshot'])
+        gameid = games[len(games) // 2].gameid
+        print('{:<10} {:>10} {:>14}'.format('format', 'size MB', 'cold start ms'))
+        for kind, path in paths.items():
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_snapshot', '--measure', kind, str(path), gameid],
+                check=True, capture_output=True, text=True
+            ).stdout
+            print('{:<10} {:>10.1f} {:>14.1f}'.format(
+                kind, path.stat().st_size / (1024 * 1024), float(output) * 1000))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        measure(*sys.argv[2:5])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES)
@@ -0,0 +1,55 @@
+"""Shared helpers for the benchmark scripts
+
+Running a benchmark:
+- `python3 -m benchmarks.bench_download`
+
+"""
+from typing import Callable, Tuple
+from pathlib import Path
+from datetime import datetime, timedelta
+import csv
+import time
+
+from lol_updater import parsers
+
+FIXTURES_DIR = Path(__file__).parent.parent / 'tests' / 'fixtures'
+GAMES_CSV = FIXTURES_DIR / 'games.csv'
+# oldest date used for synthetic games
+EPOCH = datetime(2022, 1, 1)
+
+
+def scale_games_csv(path: Path, ngames: int, source: Path = GAMES_CSV) -> Path:
+    '''
+    Writes ngames games to path by repeating the games in source,
+    giving each copy a unique gameid and a later date than the one before
+    '''
+    with open(source, 'r', newline='') as finput:
+        reader = csv.DictReader(finput)
+        fieldnames = reader.fieldnames
+        templates = []
+        for row in reader:
+            if not templates or templates[-1][0]['gameid'] != row['gameid']:
+                templates.append([])
+            templates[-1].append(row)
+    with open(path, 'w', newline='') as foutput:
+        writer = csv.DictWriter(foutput, fieldnames)
+        writer.writeheader()
+        for i in range(ngames):
+            gameid = 'SYNTH_{:08d}'.format(i)
+            date = (EPOCH + timedelta(minutes=i)).strftime(parsers.EA_DT_FORMAT)
+            for row in templates[i % len(templates)]:
+                writer.writerow(dict(row, gameid=gameid, date=date))
+    return path
+
+
+def timed(fn: Callable, *args, **kwargs) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def consume(items) -> int:
+    count = 0
+    for _ in items:
+        count += 1
+    return count
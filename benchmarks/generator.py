@@ -0,0 +1,147 @@
+"""Deterministic synthetic seasons in the Oracle's Elixir csv layout
+
+Running (writes a csv):
+- `python3 -m benchmarks.generator [ngames] [path]`
+
+"""
+import csv
+import sys
+import random
+import hashlib
+from typing import Dict, Iterator, List
+from pathlib import Path
+from datetime import timedelta
+
+from lol_updater import parsers
+
+from . import common
+
+NGAMES = 10000
+LEAGUES = ('LCK', 'LPL', 'LEC', 'LCS', 'PCS', 'VCS', 'CBLOL', 'LJL')
+SPLITS = ('Spring', 'Summer')
+TEAMS_PER_LEAGUE = 10
+POSITIONS = ('top', 'jng', 'mid', 'bot', 'sup')
+SIDES = ('Blue', 'Red')
+# share of player and team rows without an id (the parser falls back to a slug of the name)
+MISSING_IDS = 0.05
+# share of games dated in the iso layout (parsers.INPUT_DT_FORMAT) rather than the csv one (parsers.EA_DT_FORMAT)
+ISO_DATES = 0.1
+
+
+def make_id(kind: str, name: str) -> str:
+    return 'oe:{}:{}'.format(kind, hashlib.md5(name.encode()).hexdigest()[:31])
+
+
+def fieldnames(source: Path = common.GAMES_CSV) -> List[str]:
+    '''
+    The full header of a real file, so that rows are as wide as the ones we download
+    '''
+    with open(source, 'r', newline='') as finput:
+        return next(csv.reader(finput))
+
+
+class SeasonGenerator:
+    '''
+    Yields the rows of ngames games: 10 player rows then 2 team rows each, in date order.
+
+    The same arguments always give the same rows.
+    '''
+
+    def __init__(self, ngames: int, seed: int = 0, missing_ids: float = MISSING_IDS, iso_dates: float = ISO_DATES):
+        self.ngames = ngames
+        self.seed = seed
+        self.missing_ids = missing_ids
+        self.iso_dates = iso_dates
+        self.fieldnames = fieldnames()
+        self.empty = dict.fromkeys(self.fieldnames, '')
+        self.teams = {
+            league: ['{} Team {}'.format(league, i) for i in range(TEAMS_PER_LEAGUE)] for league in LEAGUES
+        }
+
+    def maybe_id(self, rng: random.Random, kind: str, name: str) -> str:
+        return '' if rng.random() < self.missing_ids else make_id(kind, name)
+
+    def player_row(self, rng: random.Random, team: str, position: str, won: bool) -> Dict:
+        name = '{} {}'.format(team, position)
+        return dict(
+            position=position,
+            playername=name,
+            playerid=self.maybe_id(rng, 'player', name),
+            result=int(won),
+            kills=rng.randrange(12),
+            deaths=rng.randrange(10),
+            assists=rng.randrange(20),
+            damagetochampions=rng.randrange(1000, 40000),
+            visionscore=rng.randrange(10, 120),
+            totalgold=rng.randrange(5000, 20000),
+            golddiffat15=rng.randrange(-3000, 3000),
+        )
+
+    def team_row(self, rng: random.Random, won: bool, firsts: Dict[str, bool]) -> Dict:
+        return dict(
+            position='team',
+            result=int(won),
+            dragons=rng.randrange(5),
+            elders=rng.randrange(2),
+            heralds=rng.randrange(3),
+            barons=rng.randrange(3),
+            towers=rng.randrange(12),
+            **{attr: int(first) for attr, first in firsts.items()}
+        )
+
+    def games(self) -> Iterator[List[Dict]]:
+        rng = random.Random(self.seed)
+        date = common.EPOCH
+        for i in range(self.ngames):
+            date += timedelta(minutes=rng.randrange(20, 60))
+            league = rng.choice(LEAGUES)
+            blue, red = rng.sample(self.teams[league], 2)
+            blue_won = rng.random() < 0.5
+            fmt = parsers.INPUT_DT_FORMAT if rng.random() < self.iso_dates else parsers.EA_DT_FORMAT
+            common_values = dict(
+                gameid='SYNTH_{:08d}'.format(i),
+                datacompleteness=rng.choice(('complete', 'complete', 'partial')),
+                league=league,
+                year=date.year,
+                split=SPLITS[date.month > 6],
+                playoffs=int(rng.random() < 0.2),
+                date=date.strftime(fmt),
+                game=rng.randrange(1, 4),
+                patch='12.{:02d}'.format(date.month),
+                gamelength=rng.randrange(1200, 2700),
+            )
+            rows = []
+            for side, team, won in ((SIDES[0], blue, blue_won), (SIDES[1], red, not blue_won)):
+                for position in POSITIONS:
+                    rows.append(dict(self.player_row(rng, team, position, won), side=side, teamname=team))
+            # which side took each first objective
+            blue_firsts = {attr: rng.random() < 0.5 for attr in parsers.TeamGame.BOOL_ATTRS}
+            for side, team, won in ((SIDES[0], blue, blue_won), (SIDES[1], red, not blue_won)):
+                firsts = {attr: first == (side == SIDES[0]) for attr, first in blue_firsts.items()}
+                row = self.team_row(rng, won, firsts)
+                rows.append(dict(row, side=side, teamname=team, teamid=self.maybe_id(rng, 'team', team)))
+            for participantid, row in zip(list(range(1, 11)) + [100, 200], rows):
+                row.update(common_values, participantid=participantid)
+                if row['position'] != 'team':
+                    row['teamid'] = make_id('team', row['teamname'])
+            yield rows
+
+    def __iter__(self) -> Iterator[Dict]:
+        for rows in self.games():
+            for row in rows:
+                yield dict(self.empty, **{key: str(value) for key, value in row.items()})
+
+    def write(self, path: Path) -> Path:
+        with open(path, 'w', newline='') as foutput:
+            writer = csv.writer(foutput)
+            writer.writerow(self.fieldnames)
+            for row in self:
+                writer.writerow([row[name] for name in self.fieldnames])
+        return path
+
+
+if __name__ == '__main__':
+    ngames = int(sys.argv[1]) if len(sys.argv) > 1 else NGAMES
+    path = Path(sys.argv[2]) if len(sys.argv) > 2 else Path('season_{}.csv'.format(ngames))
+    SeasonGenerator(ngames).write(path)
+    print(path)
@@ -0,0 +1,189 @@
+"""Times the parsing hot paths over synthetic seasons and keeps a history of the results
+
+Each case streams a generated csv, so the read case is the baseline the others build on.
+Results are appended to a json lines history file; --compare prints the change against
+the previous run of the same case and size.
+
+Running:
+- `python3 -m benchmarks.suite [ngames ...] [--repeat N] [--compare] [--history PATH] [--no-save]`
+- `python3 -m benchmarks.suite 10000 100000 1000000 --compare`
+
+"""
+import csv
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Callable, Dict, Iterator, List, Optional
+from pathlib import Path
+from datetime import datetime
+from itertools import islice
+
+from lol_updater import iterators
+from lol_updater import parsers
+
+from . import common
+from .generator import SeasonGenerator
+
+NGAMES = 10000
+ROWS_PER_GAME = 12
+HISTORY = Path(__file__).parent / 'history.jsonl'
+
+
+def rows(path: Path) -> Iterator[Dict]:
+    with open(path, 'r', newline='') as finput:
+        yield from iterators.Columns(csv.reader(finput), parsers.COLUMNS)
+
+
+def read(path: Path, latest: datetime):
+    common.consume(rows(path))
+
+
+def parse_dt(path: Path, latest: datetime):
+    parse = parsers.parse_dt
+    for row in rows(path):
+        parse(row['date'])
+
+
+def game_from_row(path: Path, latest: datetime):
+    from_row = parsers.Game.from_row
+    for row in rows(path):
+        from_row(row)
+
+
+def latest_rows(path: Path, latest: datetime):
+    common.consume(iterators.Latest(latest, rows(path), parsers.parse_dt))
+
+
+def game_iterator(path: Path, latest: datetime):
+    common.consume(parsers.GameIterator(rows(path)))
+
+
+def dict_roundtrip(path: Path, latest: datetime):
+    for game in parsers.GameIterator(rows(path)):
+        parsers.Game.from_dict(game.as_dict())
+
+
+CASES: List[tuple] = [
+    ('read', read),
+    ('parse_dt', parse_dt),
+    ('Game.from_row', game_from_row),
+    ('Latest (half skipped)', latest_rows),
+    ('GameIterator', game_iterator),
+    ('as_dict/from_dict', dict_roundtrip),
+]
+
+
+def middle_date(path: Path, ngames: int) -> datetime:
+    row = next(islice(rows(path), (ngames // 2) * ROWS_PER_GAME, None))
+    return parsers.parse_dt(row['date'])
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def best_of(fn: Callable, repeat: int, *args) -> float:
+    times = []
+    for _ in range(repeat):
+        parsers.parse_dt.cache_clear()
+        seconds, _ = common.timed(fn, *args)
+        times.append(seconds)
+    return min(times)
+
+
+def run(ngames: int, repeat: int, run_id: str, commit: Optional[str]) -> List[Dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = SeasonGenerator(ngames).write(Path(tmpdir, 'season.csv'))
+        latest = middle_date(path, ngames)
+        for name, fn in CASES:
+            seconds = best_of(fn, repeat, path, latest)
+            results.append(dict(
+                run=run_id,
+                commit=commit,
+                python=platform.python_version(),
+                ngames=ngames,
+                case=name,
+                seconds=seconds,
+                rows_per_sec=ngames * ROWS_PER_GAME / seconds,
+                games_per_sec=ngames / seconds,
+            ))
+    return results
+
+
+def load_history(path: Path) -> List[Dict]:
+    if not path.exists():
+        return []
+    with open(path, 'r') as finput:
+        return [json.loads(line) for line in finput if line.strip()]
+
+
+def save_history(path: Path, results: List[Dict]):
+    with open(path, 'a') as foutput:
+        for result in results:
+            foutput.write(json.dumps(result))
+            foutput.write('\n')
+
+
+def previous(history: List[Dict], result: Dict) -> Optional[Dict]:
+    '''
+    The last recorded result for the same case and size, from an earlier run
+    '''
+    for item in reversed(history):
+        if item['case'] == result['case'] and item['ngames'] == result['ngames'] and item['run'] != result['run']:
+            return item
+    return None
+
+
+def report(results: List[Dict], history: List[Dict] = None):
+    baselines = {result['ngames']: result['seconds'] for result in results if result['case'] == 'read'}
+    header = '{:>9} {:<22} {:>9} {:>9} {:>12} {:>12}'.format(
+        'games', 'case', 'seconds', 'net', 'rows/sec', 'games/sec')
+    if history is not None:
+        header += ' {:>9} {:>9}'.format('previous', 'change')
+    print(header)
+    for result in results:
+        net = result['seconds'] - baselines[result['ngames']] if result['case'] != 'read' else result['seconds']
+        line = '{:>9,} {:<22} {:>9.3f} {:>9.3f} {:>12,.0f} {:>12,.0f}'.format(
+            result['ngames'], result['case'], result['seconds'], net,
+            result['rows_per_sec'], result['games_per_sec'])
+        if history is not None:
+            item = previous(history, result)
+            if item is None:
+                line += ' {:>9} {:>9}'.format('-', '-')
+            else:
+                # positive is faster
+                change = item['seconds'] / result['seconds'] - 1
+                line += ' {:>9} {:>+8.1%}'.format(item['commit'] or item['run'][:10], change)
+        print(line)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='lol_updater benchmark suite')
+    parser.add_argument('ngames', nargs='*', type=int, default=[NGAMES], help='games per generated season')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case, the fastest is kept')
+    parser.add_argument('--history', type=Path, default=HISTORY, help='json lines file of past results')
+    parser.add_argument('--compare', action='store_true', help='show the change against the previous run')
+    parser.add_argument('--no-save', action='store_true', help='do not add the results to the history')
+    args = parser.parse_args(argv)
+
+    run_id = datetime.now().isoformat(timespec='seconds')
+    commit = git_commit()
+    results = []
+    for ngames in args.ngames:
+        results.extend(run(ngames, args.repeat, run_id, commit))
+    report(results, load_history(args.history) if args.compare else None)
+    if not args.no_save:
+        save_history(args.history, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import json
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from pathlib import Path
+from dataclasses import dataclass, field
+
+from . import parsers
+from . import utils
+
+# (league, split)
+Group = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass
+class PlayerAggregate:
+    playerid: str
+    name: str
+    games: int = 0
+    totals: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(parsers.PlayerGame.INT_ATTRS, 0))
+
+    def add(self, playergame: parsers.PlayerGame):
+        self.name = playergame.player.name
+        self.games += 1
+        totals = self.totals
+        for attr in parsers.PlayerGame.INT_ATTRS:
+            totals[attr] += getattr(playergame, attr)
+
+    def average(self, attr: str) -> float:
+        return self.totals[attr] / self.games if self.games else 0.0
+
+    @property
+    def kda(self) -> float:
+        '''
+        (kills + assists) / deaths, counting zero deaths as one
+        '''
+        return (self.totals['kills'] + self.totals['assists']) / max(self.totals['deaths'], 1)
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(data['playerid'], data['name'], data['games'], data['totals'])
+
+    def as_dict(self) -> Dict:
+        return dict(playerid=self.playerid, name=self.name, games=self.games, totals=self.totals)
+
+
+@dataclass
+class TeamAggregate:
+    teamid: str
+    name: str
+    games: int = 0
+    wins: int = 0
+    totals: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(parsers.TeamGame.INT_ATTRS, 0))
+    # games in which each of TeamGame.BOOL_ATTRS was true
+    firsts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(parsers.TeamGame.BOOL_ATTRS, 0))
+
+    def add(self, teamgame: parsers.TeamGame):
+        self.name = teamgame.team.name
+        self.games += 1
+        self.wins += teamgame.win
+        for attr in parsers.TeamGame.INT_ATTRS:
+            self.totals[attr] += getattr(teamgame, attr)
+        for attr in parsers.TeamGame.BOOL_ATTRS:
+            self.firsts[attr] += getattr(teamgame, attr)
+
+    def average(self, attr: str) -> float:
+        return self.totals[attr] / self.games if self.games else 0.0
+
+    def rate(self, attr: str) -> float:
+        '''
+        Fraction of games in which attr (win or one of TeamGame.BOOL_ATTRS) was true
+        '''
+        hits = self.wins if attr == 'win' else self.firsts[attr]
+        return hits / self.games if self.games else 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(data['teamid'], data['name'], data['games'], data['wins'], data['totals'], data['firsts'])
+
+    def as_dict(self) -> Dict:
+        return dict(
+            teamid=self.teamid, name=self.name, games=self.games, wins=self.wins,
+            totals=self.totals, firsts=self.firsts
+        )
+
+
+class AggregateIndex:
+    '''
+    Running per player and per team totals for each league and split, so that a player's season stats
+    are a dict lookup instead of a scan over every game.
+
+    Games are added as they are parsed (see observe) and the gameids already counted are kept,
+    so feeding the same game twice does not count it twice. The index is kept in a json file at path.
+    '''
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else None
+        self.players: Dict[Group, Dict[str, PlayerAggregate]] = {}
+        self.teams: Dict[Group, Dict[str, TeamAggregate]] = {}
+        self.gameids: Set[str] = set()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def add(self, game: parsers.Game) -> bool:
+        '''
+        Adds the stats of game, unless it was added before. Returns whether it was added
+        '''
+        if game.gameid in self.gameids:
+            return False
+        self.gameids.add(game.gameid)
+        group = (game.league, game.split)
+        players = self.players.setdefault(group, {})
+        for playergame in game.playergames:
+            playerid = playergame.player.playerid
+            aggregate = players.get(playerid)
+            if aggregate is None:
+                aggregate = players[playerid] = PlayerAggregate(playerid, playergame.player.name)
+            aggregate.add(playergame)
+        teams = self.teams.setdefault(group, {})
+        for teamgame in game.teamgames:
+            teamid = teamgame.team.teamid
+            aggregate = teams.get(teamid)
+            if aggregate is None:
+                aggregate = teams[teamid] = TeamAggregate(teamid, teamgame.team.name)
+            aggregate.add(teamgame)
+        return True
+
+    def update(self, games: Iterable[parsers.Game]) -> int:
+        '''
+        Adds games and returns how many were new
+        '''
+        return sum(self.add(game) for game in games)
+
+    def observe(self, games: Iterable[parsers.Game]) -> Iterator[parsers.Game]:
+        '''
+        Passes games through, adding each one on the way
+        '''
+        for game in games:
+            self.add(game)
+            yield game
+
+    def player(self, playerid: str, league: str, split: str) -> Optional[PlayerAggregate]:
+        return self.players.get((league, split), {}).get(playerid)
+
+    def team(self, teamid: str, league: str, split: str) -> Optional[TeamAggregate]:
+        return self.teams.get((league, split), {}).get(teamid)
+
+    def player_leaders(self, attr: str, league: str, split: str, count: int = 10,
+                       average: bool = False) -> List[PlayerAggregate]:
+        '''
+        The count players of a league and split with the highest total (or average) of attr
+        '''
+        players = self.players.get((league, split), {}).values()
+        if average:
+            return heapq.nlargest(count, players, key=lambda item: item.average(attr))
+        return heapq.nlargest(count, players, key=lambda item: item.totals[attr])
+
+    def team_leaders(self, attr: str, league: str, split: str, count: int = 10) -> List[TeamAggregate]:
+        '''
+        The count teams of a league and split with the highest rate of attr (win or one of TeamGame.BOOL_ATTRS)
+        '''
+        teams = self.teams.get((league, split), {}).values()
+        return heapq.nlargest(count, teams, key=lambda item: item.rate(attr))
+
+    def load(self):
+        with open(self.path, 'r') as finput:
+            data = json.load(finput)
+        self.gameids = set(data['gameids'])
+        for item in data['players']:
+            self.players.setdefault((item['league'], item['split']), {})[item['playerid']] = \
+                PlayerAggregate.from_dict(item)
+        for item in data['teams']:
+            self.teams.setdefault((item['league'], item['split']), {})[item['teamid']] = \
+                TeamAggregate.from_dict(item)
+
+    def save(self):
+        if self.path is None:
+            return
+        data = dict(
+            gameids=sorted(self.gameids),
+            players=[
+                dict(aggregate.as_dict(), league=league, split=split)
+                for (league, split), players in self.players.items() for aggregate in players.values()
+            ],
+            teams=[
+                dict(aggregate.as_dict(), league=league, split=split)
+                for (league, split), teams in self.teams.items() for aggregate in teams.values()
+            ],
+        )
+        utils.atomic_write_json(self.path, data)
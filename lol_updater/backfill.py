@@ -0,0 +1,100 @@
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import iterfactory
+from . import locator
+from . import parsers
+
+WORKERS = 4
+PER_HOST = 2
+
+
+class HostLimiter:
+    '''
+    Caps the number of concurrent downloads from each host and
+    spaces out the start of successive downloads by at least interval seconds
+    '''
+
+    def __init__(self, concurrency: int = PER_HOST, interval: float = 0.0):
+        self.concurrency = concurrency
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.semaphores: Dict[str, threading.Semaphore] = {}
+        self.next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def acquire(self, url: str):
+        host = urlsplit(url).netloc
+        with self.lock:
+            semaphore = self.semaphores.setdefault(host, threading.Semaphore(self.concurrency))
+        with semaphore:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self.next_start.get(host, now))
+                self.next_start[host] = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def make_session(pool_size: int) -> requests.Session:
+    '''
+    Session whose connection pool can keep a connection open for each worker
+    '''
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def collect(link: locator.Link, games: Iterable[parsers.Game]) -> List[parsers.Game]:
+    return list(games)
+
+
+class Backfill:
+    '''
+    Downloads and parses a set of links concurrently.
+
+    Each link is streamed and parsed in a worker thread and its games handed to handler(link, games),
+    also in that thread, so parsing one season overlaps the downloads of the others.
+    requests is synchronous, so this uses a thread pool rather than asyncio.
+    '''
+
+    def __init__(
+        self,
+        links: Iterable[locator.Link],
+        latest: datetime = datetime.min,
+        handler: Callable = collect,
+        workers: int = WORKERS,
+        per_host: int = PER_HOST,
+        interval: float = 0.0,
+        session: requests.Session = None
+    ):
+        self.links = list(links)
+        self.latest = latest
+        self.handler = handler
+        self.workers = workers
+        self.limiter = HostLimiter(per_host, interval)
+        self.session = session or make_session(workers)
+
+    def fetch(self, link: locator.Link):
+        with self.limiter.acquire(link.link):
+            lines = locator.download_games(link.link, stream=True, session=self.session)
+            return self.handler(link, iterfactory.csv_game_iterator(self.latest, lines))
+
+    def run(self) -> List[Tuple[locator.Link, object]]:
+        '''
+        Returns each link with what the handler returned for it, in the order of links
+        '''
+        with ThreadPoolExecutor(self.workers) as pool:
+            futures = [(link, pool.submit(self.fetch, link)) for link in self.links]
+            return [(link, future.result()) for link, future in futures]
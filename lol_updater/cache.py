@@ -0,0 +1,191 @@
+import json
+from typing import Dict, Iterator, Optional
+from pathlib import Path
+from dataclasses import dataclass, asdict
+
+import requests
+
+from . import compression
+from . import locator
+from . import metrics
+from . import utils
+
+ENTRY_FILENAME = 'entry.json'
+INDEX_FILENAME = 'resume.json'
+PART_SUFFIX = '.part'
+# kept small so that little is lost when a transfer breaks off
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class CacheStats:
+    # links served from disk, with or without asking the server
+    hits: int = 0
+    # links whose file had to be (at least partly) downloaded
+    misses: int = 0
+    # hits confirmed by the server with a 304
+    revalidated: int = 0
+    # interrupted downloads continued with a range request
+    resumed: int = 0
+    bytes_downloaded: int = 0
+    bytes_saved: int = 0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class CacheEntry:
+    '''
+    What we know about the cached file for one year
+    '''
+    filename: str
+    ts: str
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    size: int = 0
+    complete: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(**data)
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+    def validators(self) -> Dict:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class LinkCache:
+    '''
+    Keeps the latest csv file for each year of match data in a local directory.
+
+    Files are stored as <directory>/<year>/<Link.filename>. A link whose timestamp matches the
+    cached file is served without touching the network, otherwise the cached file is revalidated
+    with the server (ETag/Last-Modified) and only downloaded again if it really changed.
+    Interrupted downloads are continued with a Range request on the next fetch.
+    '''
+
+    def __init__(self, directory, session: requests.Session = None, chunk_size: int = CHUNK_SIZE):
+        self.directory = Path(directory)
+        self.session = session or requests.Session()
+        self.chunk_size = chunk_size
+        self.stats = CacheStats()
+
+    def path(self, link: locator.Link) -> Path:
+        return Path(self.directory, str(link.year), link.filename)
+
+    def index_path(self, link: locator.Link) -> Path:
+        '''
+        Where to keep the resume.ResumeIndex for the year of link
+        '''
+        return Path(self.directory, str(link.year), INDEX_FILENAME)
+
+    def load_entry(self, link: locator.Link) -> Optional[CacheEntry]:
+        path = Path(self.directory, str(link.year), ENTRY_FILENAME)
+        if not path.exists():
+            return None
+        with open(path, 'r') as finput:
+            return CacheEntry.from_dict(json.load(finput))
+
+    def save_entry(self, link: locator.Link, entry: CacheEntry):
+        path = Path(self.directory, str(link.year), ENTRY_FILENAME)
+        utils.atomic_write_json(path, entry.as_dict(), indent=4)
+
+    def fetch(self, link: locator.Link) -> Path:
+        '''
+        Makes sure the file for link is on disk and returns its path
+        '''
+        path = self.path(link)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        ts = link.ts.strftime(locator.DT_FORMAT)
+        entry = self.load_entry(link)
+        if entry and entry.complete and entry.filename == link.filename and entry.ts == ts and path.exists():
+            self.stats.hits += 1
+            self.stats.bytes_saved += entry.size
+            return path
+
+        part_path = path.with_name(path.name + PART_SUFFIX)
+        previous = None
+        offset = 0
+        # byte ranges only make sense against the unencoded file
+        headers = {'Accept-Encoding': 'identity'}
+        if entry and not entry.complete and entry.filename == link.filename and part_path.exists():
+            # carry on where the last attempt stopped, provided the file has not changed since
+            offset = part_path.stat().st_size
+            headers['Range'] = f'bytes={offset}-'
+            if entry.etag or entry.last_modified:
+                headers['If-Range'] = entry.etag or entry.last_modified
+        elif entry and entry.complete and Path(path.parent, entry.filename).exists():
+            previous = Path(path.parent, entry.filename)
+            headers.update(entry.validators())
+
+        req = self.session.get(link.link, headers=headers, stream=True)
+        try:
+            if req.status_code == 304 and previous is not None:
+                previous.replace(path)
+                entry.filename = link.filename
+                entry.ts = ts
+                self.save_entry(link, entry)
+                self.stats.hits += 1
+                self.stats.revalidated += 1
+                self.stats.bytes_saved += entry.size
+                return path
+            if req.status_code == 416:
+                # the partial file is no use to us, start again
+                part_path.unlink()
+                return self.fetch(link)
+            req.raise_for_status()
+            if req.status_code == 206:
+                self.stats.resumed += 1
+                self.stats.bytes_saved += offset
+                mode = 'ab'
+            else:
+                offset = 0
+                mode = 'wb'
+                # a fresh download replaces whatever an earlier one left behind for this year
+                for stale in path.parent.glob('*' + PART_SUFFIX):
+                    if stale != part_path:
+                        stale.unlink()
+            self.stats.misses += 1
+            entry = CacheEntry(
+                link.filename,
+                ts,
+                link.link,
+                etag=req.headers.get('ETag'),
+                last_modified=req.headers.get('Last-Modified')
+            )
+            # record the validators before reading so that an interrupted transfer can be resumed
+            self.save_entry(link, entry)
+            downloaded = self.stats.bytes_downloaded
+            try:
+                with open(part_path, mode) as foutput:
+                    for chunk in req.iter_content(self.chunk_size):
+                        foutput.write(chunk)
+                        self.stats.bytes_downloaded += len(chunk)
+            finally:
+                if metrics.registry.enabled:
+                    metrics.registry.incr('bytes_downloaded', self.stats.bytes_downloaded - downloaded)
+        finally:
+            req.close()
+        part_path.replace(path)
+        if previous is not None and previous != path:
+            previous.unlink()
+        entry.size = path.stat().st_size
+        entry.complete = True
+        self.save_entry(link, entry)
+        return path
+
+    def lines(self, link: locator.Link) -> Iterator[str]:
+        '''
+        Yields the lines of the (cached) csv file for link
+        '''
+        # archived files may have been compressed since they were downloaded
+        yield from compression.lines(self.fetch(link))
@@ -0,0 +1,97 @@
+import json
+import hashlib
+from typing import Dict, Iterable, Iterator, Optional
+from pathlib import Path
+from dataclasses import dataclass
+
+from . import parsers
+from . import serializers
+from . import utils
+
+INSERTED = 'inserted'
+UPDATED = 'updated'
+DELETED = 'deleted'
+DIGEST_SIZE = 16
+
+
+def digest(game: parsers.Game) -> str:
+    '''
+    Hash of everything game.as_dict() holds
+    '''
+    return hashlib.blake2b(serializers.encode_game(game).encode(), digest_size=DIGEST_SIZE).hexdigest()
+
+
+@dataclass
+class Change:
+    kind: str
+    gameid: str
+    # None for deleted games
+    game: Optional[parsers.Game] = None
+
+
+class DigestStore:
+    '''
+    gameid -> digest of every game seen in the previous run, kept in a json file at path
+    '''
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else None
+        self.digests: Dict[str, str] = {}
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def load(self):
+        with open(self.path, 'r') as finput:
+            self.digests = json.load(finput)
+
+    def save(self):
+        if self.path is None:
+            return
+        utils.atomic_write_json(self.path, self.digests)
+
+
+class ChangeIterator:
+    '''
+    Compares games, the full contents of a file, against the digests in store and yields
+    only the games that are new or differ, then a deleted change for every stored game that is gone.
+
+    The store is only updated by commit(), which the consumer calls once games are exhausted and
+    the changes are durable, so an interrupted or failed run reports the same changes again next time.
+    '''
+
+    def __init__(self, games: Iterable[parsers.Game], store: DigestStore):
+        self.games = games
+        self.store = store
+        self.counts: Dict[str, int] = {INSERTED: 0, UPDATED: 0, DELETED: 0, 'unchanged': 0}
+        # digests of every game read, once games are exhausted
+        self.current: Optional[Dict[str, str]] = None
+
+    def commit(self):
+        '''
+        Saves the digests of this run's games to the store
+        '''
+        if self.current is None:
+            raise ValueError('commit before the changes were all read')
+        self.store.digests = self.current
+        self.store.save()
+
+    def __iter__(self) -> Iterator[Change]:
+        previous = self.store.digests
+        current: Dict[str, str] = {}
+        for game in self.games:
+            value = digest(game)
+            current[game.gameid] = value
+            stored = previous.get(game.gameid)
+            if stored is None:
+                kind = INSERTED
+            elif stored != value:
+                kind = UPDATED
+            else:
+                self.counts['unchanged'] += 1
+                continue
+            self.counts[kind] += 1
+            yield Change(kind, game.gameid, game)
+        for gameid in sorted(previous.keys() - current.keys()):
+            self.counts[DELETED] += 1
+            yield Change(DELETED, gameid)
+        self.current = current
@@ -0,0 +1,208 @@
+import os
+import json
+from typing import BinaryIO, Dict, Iterator, Optional
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass
+
+from . import locator
+from . import parsers
+from . import resume
+from . import utils
+
+# games between two checkpoints
+CHECKPOINT_EVERY = 1000
+
+
+@dataclass
+class Checkpoint:
+    '''
+    The last game of a yearly file known to be processed, and where its rows end
+    '''
+    ts: datetime
+    gameid: str
+    offset: int
+    checksum: str
+    # games committed over all runs
+    games: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(
+            datetime.strptime(data['ts'], parsers.INPUT_DT_FORMAT),
+            data['gameid'],
+            data['offset'],
+            data['checksum'],
+            data['games']
+        )
+
+    def as_dict(self) -> Dict:
+        return dict(
+            ts=self.ts.strftime(parsers.INPUT_DT_FORMAT),
+            gameid=self.gameid,
+            offset=self.offset,
+            checksum=self.checksum,
+            games=self.games
+        )
+
+    def index(self) -> resume.ResumeIndex:
+        return resume.ResumeIndex(self.offset, self.ts, self.checksum)
+
+
+class CheckpointStore:
+    '''
+    The Checkpoint of each yearly file, keyed by year like the LinkCache, in a json file at path.
+    Every commit is flushed to disk before it returns
+    '''
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.checkpoints: Dict[str, Checkpoint] = {}
+        if self.path.exists():
+            self.load()
+
+    @staticmethod
+    def key(link: locator.Link) -> str:
+        return str(link.year)
+
+    def get(self, link: locator.Link) -> Optional[Checkpoint]:
+        return self.checkpoints.get(self.key(link))
+
+    def latest(self, link: locator.Link) -> datetime:
+        '''
+        Timestamp of the last committed game of link, the latest to hand to iterfactory
+        '''
+        checkpoint = self.get(link)
+        return checkpoint.ts if checkpoint is not None else datetime.min
+
+    def commit(self, link: locator.Link, checkpoint: Checkpoint):
+        self.checkpoints[self.key(link)] = checkpoint
+        self.save()
+
+    def load(self):
+        with open(self.path, 'r') as finput:
+            data = json.load(finput)
+        self.checkpoints = {key: Checkpoint.from_dict(item) for key, item in data.items()}
+
+    def save(self):
+        utils.atomic_write_json(
+            self.path, {key: checkpoint.as_dict() for key, checkpoint in self.checkpoints.items()}, indent=4
+        )
+
+
+class CheckpointedGames:
+    '''
+    Yields the games of link's file fp past its checkpoint, starting at the checkpointed offset when
+    the file still matches it (or else the games newer than the checkpoint), and commits a new
+    checkpoint every `every` games.
+
+    A game counts as processed once the consumer asks for the next one, so a checkpoint never covers
+    a game the consumer has not finished with. Consumers that buffer their writes should make them
+    durable at least every `every` games, and call commit() once the writes for the last games are
+    durable too. After a crash the next run starts over from the last commit, so games since then
+    are yielded again (at least once delivery).
+    '''
+
+    def __init__(self, fp: BinaryIO, store: CheckpointStore, link: locator.Link, every: int = CHECKPOINT_EVERY,
+                 latest: datetime = datetime.min):
+        self.store = store
+        self.link = link
+        self.every = every
+        self.checkpoint = store.get(link)
+        self.latest = self.checkpoint.ts if self.checkpoint is not None else latest
+        self.reader = resume.ResumableReader(fp, self.checkpoint.index() if self.checkpoint is not None else None)
+        self.exhausted = False
+        # (game, offset, ts, count) of the last game the consumer is done with
+        self.done = None
+        # games committed by this run
+        self.committed = 0
+
+    def rows(self) -> Iterator[Dict]:
+        yield from self.reader
+        self.exhausted = True
+
+    def offset(self) -> int:
+        '''
+        Where the rows of the game being yielded end. GameIterator only yields a game once it has read
+        the first row of the next one, so until the file is exhausted that is where the last row read starts
+        '''
+        return self.reader.end if self.exhausted else self.reader.start
+
+    def commit(self):
+        '''
+        Checkpoints the last game the consumer is done with, unless it already is. fp must still be open
+        '''
+        if self.done is None or self.done[3] <= self.committed:
+            return
+        game, offset, ts, count = self.done
+        previous = self.checkpoint.games if self.checkpoint is not None else 0
+        self.checkpoint = Checkpoint(
+            ts, game.gameid, offset, resume.prefix_checksum(self.reader.fp, offset), previous + count - self.committed
+        )
+        self.store.commit(self.link, self.checkpoint)
+        self.committed = count
+
+    def __iter__(self) -> Iterator[parsers.Game]:
+        ts = self.latest
+        count = 0
+        for game in parsers.GameIterator(resume.unseen_rows(self.reader, self.latest, self.rows())):
+            offset = self.offset()
+            yield game
+            # the consumer is back for more, so it is done with game
+            count += 1
+            if game.date > ts:
+                ts = game.date
+            self.done = (game, offset, ts, count)
+            if count - self.committed >= self.every:
+                self.commit()
+
+
+@dataclass
+class Pending:
+    '''
+    What a run over a file would do, from its checkpoint
+    '''
+    checkpoint: Optional[Checkpoint]
+    # whether the checkpointed offset still matches the file
+    resumed: bool
+    offset: int
+    size: int
+    games: int
+    first: Optional[datetime] = None
+    last: Optional[datetime] = None
+
+    @property
+    def bytes(self) -> int:
+        return self.size - self.offset
+
+    def as_dict(self) -> Dict:
+        return dict(
+            checkpoint=self.checkpoint.as_dict() if self.checkpoint is not None else None,
+            resumed=self.resumed,
+            offset=self.offset,
+            size=self.size,
+            bytes=self.bytes,
+            games=self.games,
+            first=self.first.strftime(parsers.INPUT_DT_FORMAT) if self.first is not None else None,
+            last=self.last.strftime(parsers.INPUT_DT_FORMAT) if self.last is not None else None,
+        )
+
+
+def dry_run(fp: BinaryIO, store: CheckpointStore, link: locator.Link, latest: datetime = datetime.min) -> Pending:
+    '''
+    Counts the games a CheckpointedGames run over fp would yield, without committing anything
+    '''
+    games = CheckpointedGames(fp, store, link, latest=latest)
+    first = last = None
+    count = 0
+    # only the dates are needed
+    for game in parsers.GameIterator(resume.unseen_rows(games.reader, games.latest), lazy=True):
+        count += 1
+        if first is None or game.date < first:
+            first = game.date
+        if last is None or game.date > last:
+            last = game.date
+    reader = games.reader
+    offset = reader.index.offset if reader.resumed else 0
+    return Pending(games.checkpoint, reader.resumed, offset, os.fstat(fp.fileno()).st_size, count, first, last)
+
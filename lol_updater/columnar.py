@@ -0,0 +1,243 @@
+from array import array
+from typing import Dict, Iterable, List, Sequence
+from datetime import datetime, timedelta
+
+from . import parsers
+
+try:
+    import numpy
+except ImportError:  # optional - aggregates fall back to plain python loops
+    numpy = None
+
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+# array typecodes
+INT = 'i'
+LONG = 'q'
+FLAGS = 'B'
+
+
+class StringTable:
+    '''
+    Dictionary encoding of strings: each distinct value gets the next integer code
+    '''
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+
+def pack_flags(item, attrs: Sequence[str]) -> int:
+    flags = 0
+    for bit, attr in enumerate(attrs):
+        if getattr(item, attr):
+            flags |= 1 << bit
+    return flags
+
+
+def group_sum(codes: array, values: array, size: int) -> List[float]:
+    '''
+    Sums values by code
+    '''
+    if numpy is not None:
+        return numpy.bincount(
+            numpy.frombuffer(codes, dtype=numpy.int32),
+            weights=numpy.frombuffer(values, dtype=numpy.int32) if values is not None else None,
+            minlength=size
+        ).tolist()
+    totals = [0] * size
+    if values is None:
+        for code in codes:
+            totals[code] += 1
+    else:
+        for code, value in zip(codes, values):
+            totals[code] += value
+    return totals
+
+
+def unpack_flag(flags: array, bit: int) -> array:
+    if numpy is not None:
+        bits = (numpy.frombuffer(flags, dtype=numpy.uint8) >> bit) & 1
+        return array(INT, bits.astype(numpy.int32).tobytes())
+    return array(INT, [(value >> bit) & 1 for value in flags])
+
+
+class SeasonStore:
+    '''
+    Column oriented copy of a season of games.
+
+    Each table is a set of contiguous arrays. Strings (gameids, leagues, player and team ids...)
+    are dictionary encoded and player/team rows for game i are the rows
+    player_offsets[i]:player_offsets[i + 1] (team_offsets likewise).
+    Team booleans are packed into one byte per row, bit n being TeamGame.BOOL_ATTRS[n].
+    '''
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.players = StringTable()
+        self.teams = StringTable()
+        # latest name seen for each player and team code
+        self.player_names: List[str] = []
+        self.team_names: List[str] = []
+        # games
+        self.gameid = array(INT)
+        self.date = array(LONG)
+        self.duration = array(INT)
+        self.game = array(INT)
+        self.league = array(INT)
+        self.split = array(INT)
+        self.playoffs = array(FLAGS)
+        self.status = array(INT)
+        self.player_offsets = array(LONG, [0])
+        self.team_offsets = array(LONG, [0])
+        # player games
+        self.player = array(INT)
+        self.position = array(INT)
+        self.player_stats: Dict[str, array] = {
+            attr: array(INT) for attr in parsers.PlayerGame.INT_ATTRS
+        }
+        # team games
+        self.team = array(INT)
+        self.side = array(INT)
+        self.win = array(FLAGS)
+        self.team_stats: Dict[str, array] = {
+            attr: array(INT) for attr in parsers.TeamGame.INT_ATTRS
+        }
+        self.team_flags = array(FLAGS)
+
+    @classmethod
+    def from_games(cls, games: Iterable[parsers.Game]):
+        store = cls()
+        store.extend(games)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.gameid)
+
+    def extend(self, games: Iterable[parsers.Game]):
+        for game in games:
+            self.add(game)
+
+    def add(self, game: parsers.Game):
+        encode = self.strings.encode
+        self.gameid.append(encode(game.gameid))
+        self.date.append((game.date - EPOCH) // ONE_SECOND)
+        self.duration.append(game.duration)
+        self.game.append(game.game)
+        self.league.append(encode(game.league))
+        self.split.append(encode(game.split))
+        self.playoffs.append(1 if game.playoffs else 0)
+        self.status.append(encode(game.status))
+        for playergame in game.playergames:
+            player = playergame.player
+            self.player.append(self.encode_entity(self.players, self.player_names, player.playerid, player.name))
+            self.position.append(encode(playergame.position))
+            for attr, column in self.player_stats.items():
+                column.append(getattr(playergame, attr))
+        for teamgame in game.teamgames:
+            self.team.append(self.encode_entity(self.teams, self.team_names, teamgame.team.teamid, teamgame.team.name))
+            self.side.append(encode(teamgame.side))
+            self.win.append(1 if teamgame.win else 0)
+            for attr, column in self.team_stats.items():
+                column.append(getattr(teamgame, attr))
+            self.team_flags.append(pack_flags(teamgame, parsers.TeamGame.BOOL_ATTRS))
+        self.player_offsets.append(len(self.player))
+        self.team_offsets.append(len(self.team))
+
+    def encode_entity(self, table: StringTable, names: List[str], entityid: str, name: str) -> int:
+        code = table.encode(entityid)
+        if code == len(names):
+            names.append(name)
+        else:
+            names[code] = name
+        return code
+
+    def get_game(self, i: int) -> parsers.Game:
+        '''
+        Rebuilds game i as a parsers.Game
+        '''
+        decode = self.strings.decode
+        game = parsers.Game(
+            decode(self.gameid[i]),
+            EPOCH + timedelta(seconds=self.date[i]),
+            self.duration[i],
+            self.game[i],
+            decode(self.league[i]),
+            decode(self.split[i]),
+            bool(self.playoffs[i]),
+            decode(self.status[i])
+        )
+        for j in range(self.player_offsets[i], self.player_offsets[i + 1]):
+            playergame = parsers.PlayerGame(
+                parsers.Player(self.players.decode(self.player[j]), self.player_names[self.player[j]]),
+                decode(self.position[j])
+            )
+            for attr, column in self.player_stats.items():
+                setattr(playergame, attr, column[j])
+            game.playergames.append(playergame)
+        for j in range(self.team_offsets[i], self.team_offsets[i + 1]):
+            teamgame = parsers.TeamGame(
+                parsers.Team(self.teams.decode(self.team[j]), self.team_names[self.team[j]]),
+                decode(self.side[j]),
+                win=bool(self.win[j])
+            )
+            for attr, column in self.team_stats.items():
+                setattr(teamgame, attr, column[j])
+            for bit, attr in enumerate(parsers.TeamGame.BOOL_ATTRS):
+                setattr(teamgame, attr, bool(self.team_flags[j] >> bit & 1))
+            game.teamgames.append(teamgame)
+        return game
+
+    def __iter__(self) -> Iterable[parsers.Game]:
+        for i in range(len(self)):
+            yield self.get_game(i)
+
+    def player_totals(self, attr: str) -> Dict[str, int]:
+        totals = group_sum(self.player, self.player_stats[attr], len(self.players))
+        return dict(zip(self.players.values, (int(total) for total in totals)))
+
+    def player_games(self) -> Dict[str, int]:
+        counts = group_sum(self.player, None, len(self.players))
+        return dict(zip(self.players.values, (int(count) for count in counts)))
+
+    def player_kda(self) -> Dict[str, float]:
+        '''
+        (kills + assists) / deaths for each player, counting zero deaths as one
+        '''
+        size = len(self.players)
+        kills = group_sum(self.player, self.player_stats['kills'], size)
+        deaths = group_sum(self.player, self.player_stats['deaths'], size)
+        assists = group_sum(self.player, self.player_stats['assists'], size)
+        return {
+            playerid: (k + a) / max(d, 1)
+            for playerid, k, d, a in zip(self.players.values, kills, deaths, assists)
+        }
+
+    def team_rate(self, attr: str) -> Dict[str, float]:
+        '''
+        Fraction of each team's games in which attr (win or one of TeamGame.BOOL_ATTRS) was true
+        '''
+        if attr == 'win':
+            values = array(INT, self.win)
+        else:
+            values = unpack_flag(self.team_flags, parsers.TeamGame.BOOL_ATTRS.index(attr))
+        size = len(self.teams)
+        hits = group_sum(self.team, values, size)
+        games = group_sum(self.team, None, size)
+        return {
+            teamid: hit / count
+            for teamid, hit, count in zip(self.teams.values, hits, games) if count
+        }
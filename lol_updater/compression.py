@@ -0,0 +1,130 @@
+import io
+import gzip
+import bz2
+import lzma
+from typing import BinaryIO, Iterator, Optional, TextIO
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional - only needed for .zst files
+    zstandard = None
+
+GZIP = 'gzip'
+BZIP2 = 'bz2'
+XZ = 'xz'
+ZSTD = 'zstd'
+MAGIC = (
+    (b'\x1f\x8b', GZIP),
+    (b'BZh', BZIP2),
+    (b'\xfd7zXZ\x00', XZ),
+    (b'\x28\xb5\x2f\xfd', ZSTD),
+)
+SUFFIXES = {'.gz': GZIP, '.bz2': BZIP2, '.xz': XZ, '.zst': ZSTD}
+# longest magic number
+MAGIC_SIZE = 6
+BUFFER_SIZE = 1024 * 1024
+
+
+def detect(fp: io.BufferedReader) -> Optional[str]:
+    '''
+    The compression of fp from its first bytes, None for uncompressed data. Does not move fp
+    '''
+    head = fp.peek(MAGIC_SIZE)[:MAGIC_SIZE]
+    for magic, compression in MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise ImportError('zstd files need the zstandard package (pip install lol_updater[zstd])')
+
+
+class ClosingReader(io.BufferedReader):
+    '''
+    Buffers a decompressing stream and closes the file it reads from along with it
+    '''
+
+    def __init__(self, stream: BinaryIO, fp: BinaryIO):
+        super().__init__(stream, BUFFER_SIZE)
+        self.source = fp
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.source.close()
+
+
+def decompressed(fp: BinaryIO, closefd: bool = False) -> BinaryIO:
+    '''
+    Stream of the decompressed content of fp, whatever its compression.
+
+    Uncompressed input comes back as fp itself (buffered if it was not), so closing it closes fp.
+    Closing a decompressing stream only closes fp with closefd set
+    '''
+    fp = fp if isinstance(fp, io.BufferedReader) else io.BufferedReader(fp, BUFFER_SIZE)
+    compression = detect(fp)
+    if compression is None:
+        return fp
+    elif compression == ZSTD:
+        require_zstandard()
+        # files written in several frames (zstd --long, concatenated files) are read to the end
+        stream = zstandard.ZstdDecompressor().stream_reader(fp, read_across_frames=True, closefd=closefd)
+        return io.BufferedReader(stream, BUFFER_SIZE)
+    elif compression == GZIP:
+        stream = gzip.GzipFile(fileobj=fp, mode='rb')
+    elif compression == BZIP2:
+        stream = bz2.BZ2File(fp, 'rb')
+    else:
+        stream = lzma.LZMAFile(fp, 'rb')
+    return ClosingReader(stream, fp) if closefd else stream
+
+
+def open_text(path, encoding: str = 'utf-8') -> TextIO:
+    '''
+    Opens a plain or compressed file for reading text, decompressing as it is read
+    '''
+    fp = open(path, 'rb', buffering=BUFFER_SIZE)
+    try:
+        stream = decompressed(fp, closefd=True)
+    except BaseException:
+        fp.close()
+        raise
+    return io.TextIOWrapper(stream, encoding=encoding, newline='')
+
+
+def lines(path, encoding: str = 'utf-8') -> Iterator[str]:
+    '''
+    Yields the lines of a plain or compressed file, closing it at the end
+    '''
+    with open_text(path, encoding) as finput:
+        yield from finput
+
+
+def open_output(path, compression: str = None, level: int = None, encoding: str = 'utf-8') -> TextIO:
+    '''
+    Opens path for writing text, compressed as given or as its suffix says (.gz, .bz2, .xz or .zst).
+    level is the codec's compression level, its default when None
+    '''
+    path = Path(path)
+    if compression is None:
+        compression = SUFFIXES.get(path.suffix)
+    if compression == GZIP:
+        fp = gzip.open(path, 'wb', compresslevel=9 if level is None else level)
+    elif compression == BZIP2:
+        fp = bz2.open(path, 'wb', compresslevel=9 if level is None else level)
+    elif compression == XZ:
+        fp = lzma.open(path, 'wb', preset=level)
+    elif compression == ZSTD:
+        require_zstandard()
+        raw = open(path, 'wb')
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        fp = compressor.stream_writer(raw, closefd=True)
+    elif compression is None:
+        fp = open(path, 'wb')
+    else:
+        raise ValueError(f'unknown compression {compression}')
+    return io.TextIOWrapper(fp, encoding=encoding, newline='')
@@ -0,0 +1,313 @@
+import io
+from typing import Dict, Iterable, List, Set, Tuple
+from datetime import datetime
+from collections import OrderedDict
+
+from . import changes
+from . import parsers
+from . import iterfactory
+from .dimensions import DimensionCache
+
+BATCH_SIZE = 1000
+
+
+class Table:
+    '''
+    A normalized table: its columns, which of them make up the primary key and their sql types
+    '''
+
+    def __init__(self, name: str, columns: List[Tuple[str, str]], key: Tuple[str, ...]):
+        self.name = name
+        self.columns = [column for column, _ in columns]
+        self.types = OrderedDict(columns)
+        self.key = key
+        self.key_indexes = [self.columns.index(column) for column in key]
+
+    def create_sql(self) -> str:
+        columns = ', '.join(f'{column} {sqltype}' for column, sqltype in self.types.items())
+        return f'CREATE TABLE IF NOT EXISTS {self.name} ({columns}, PRIMARY KEY ({", ".join(self.key)}))'
+
+    def upsert_sql(self, placeholder: str = '?', source: str = None) -> str:
+        '''
+        Insert that updates the non key columns of rows that already exist.
+        Values come from placeholders, or from the table named source
+        '''
+        columns = ', '.join(self.columns)
+        if source is None:
+            values = 'VALUES ({})'.format(', '.join([placeholder] * len(self.columns)))
+        else:
+            values = f'SELECT {columns} FROM {source}'
+        updates = ', '.join(
+            f'{column} = excluded.{column}' for column in self.columns if column not in self.key
+        )
+        return (
+            f'INSERT INTO {self.name} ({columns}) {values} '
+            f'ON CONFLICT ({", ".join(self.key)}) DO UPDATE SET {updates}'
+        )
+
+    def row_key(self, row: Tuple) -> Tuple:
+        return tuple(row[i] for i in self.key_indexes)
+
+
+PLAYERS = Table('players', [('playerid', 'TEXT'), ('name', 'TEXT')], ('playerid',))
+TEAMS = Table('teams', [('teamid', 'TEXT'), ('name', 'TEXT')], ('teamid',))
+GAMES = Table('games', [
+    ('gameid', 'TEXT'),
+    ('date', 'TIMESTAMP'),
+    ('duration', 'INTEGER'),
+    ('game', 'INTEGER'),
+    ('league', 'TEXT'),
+    ('split', 'TEXT'),
+    ('playoffs', 'BOOLEAN'),
+    ('status', 'TEXT'),
+], ('gameid',))
+PLAYER_GAMES = Table('player_games', [
+    ('gameid', 'TEXT'),
+    ('playerid', 'TEXT'),
+    ('position', 'TEXT'),
+] + [(attr, 'INTEGER') for attr in parsers.PlayerGame.INT_ATTRS], ('gameid', 'playerid', 'position'))
+TEAM_GAMES = Table('team_games', [
+    ('gameid', 'TEXT'),
+    ('teamid', 'TEXT'),
+    ('side', 'TEXT'),
+    ('win', 'BOOLEAN'),
+] + [(attr, 'INTEGER') for attr in parsers.TeamGame.INT_ATTRS]
+  + [(attr, 'BOOLEAN') for attr in parsers.TeamGame.BOOL_ATTRS], ('gameid', 'teamid', 'side'))
+
+# in dependency order
+TABLES = (PLAYERS, TEAMS, GAMES, PLAYER_GAMES, TEAM_GAMES)
+# (id, name) tables that a DimensionCache can vouch for
+DIMENSION_TABLES = (PLAYERS, TEAMS)
+# tables holding the rows of one game
+GAME_TABLES = (PLAYER_GAMES, TEAM_GAMES)
+
+
+def format_dt(value: datetime) -> str:
+    return value.isoformat(' ', 'seconds')
+
+
+def game_rows(game: parsers.Game) -> Dict[Table, List[Tuple]]:
+    '''
+    The rows of each table for game
+    '''
+    rows = {table: [] for table in TABLES}
+    rows[GAMES].append((
+        game.gameid, format_dt(game.date), game.duration, game.game,
+        game.league, game.split, game.playoffs, game.status
+    ))
+    for playergame in game.playergames:
+        rows[PLAYERS].append((playergame.player.playerid, playergame.player.name))
+        rows[PLAYER_GAMES].append((
+            game.gameid, playergame.player.playerid, playergame.position,
+            *[getattr(playergame, attr) for attr in parsers.PlayerGame.INT_ATTRS]
+        ))
+    for teamgame in game.teamgames:
+        rows[TEAMS].append((teamgame.team.teamid, teamgame.team.name))
+        rows[TEAM_GAMES].append((
+            game.gameid, teamgame.team.teamid, teamgame.side, teamgame.win,
+            *[getattr(teamgame, attr) for attr in parsers.TeamGame.INT_ATTRS],
+            *[getattr(teamgame, attr) for attr in parsers.TeamGame.BOOL_ATTRS]
+        ))
+    return rows
+
+
+def copy_value(value) -> str:
+    if value is None:
+        return '\\N'
+    elif value is True:
+        return 't'
+    elif value is False:
+        return 'f'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_buffer(rows: Iterable[Tuple]) -> io.StringIO:
+    '''
+    rows in postgres COPY text format
+    '''
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join([copy_value(value) for value in row]))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+class SqliteBackend:
+    '''
+    Writes batches with executemany upserts on a sqlite3 connection
+    '''
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create_tables(self):
+        for table in TABLES:
+            self.connection.execute(table.create_sql())
+        self.connection.commit()
+
+    def write(self, table: Table, rows: List[Tuple]):
+        self.connection.executemany(table.upsert_sql('?'), rows)
+
+    def delete(self, table: Table, gameids: Iterable[str]):
+        self.connection.executemany(f'DELETE FROM {table.name} WHERE gameid = ?', [(gameid,) for gameid in gameids])
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+
+class PostgresBackend:
+    '''
+    Writes batches by COPYing them into a temporary staging table and upserting from there.
+
+    Expects a psycopg2 style connection (cursor().copy_expert).
+    '''
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create_tables(self):
+        with self.connection.cursor() as cursor:
+            for table in TABLES:
+                cursor.execute(table.create_sql())
+        self.connection.commit()
+
+    def write(self, table: Table, rows: List[Tuple]):
+        stage = f'stage_{table.name}'
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMPORARY TABLE IF NOT EXISTS {stage} (LIKE {table.name})')
+            cursor.execute(f'TRUNCATE {stage}')
+            cursor.copy_expert(
+                f'COPY {stage} ({", ".join(table.columns)}) FROM STDIN',
+                copy_buffer(rows)
+            )
+            cursor.execute(table.upsert_sql(source=stage))
+
+    def delete(self, table: Table, gameids: Iterable[str]):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table.name} WHERE gameid = ANY(%s)', (list(gameids),))
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+
+class Loader:
+    '''
+    Normalizes games into players, teams, games, player_games and team_games rows
+    and writes them to backend batch_size games at a time, one transaction per batch.
+    Every table is upserted, so loading a game again updates it in place.
+
+    With a DimensionCache, players and teams already written with the same name are skipped.
+    apply() takes the output of changes.ChangeIterator and also removes deleted games,
+    and the player and team rows of updated ones before writing them again.
+    It commits the ChangeIterator once the last batch is committed.
+    '''
+
+    def __init__(self, backend, batch_size: int = BATCH_SIZE, dimensions: DimensionCache = None):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.dimensions = dimensions
+        self.pending = 0
+        self.batch: Dict[Table, Dict[Tuple, Tuple]] = {table: {} for table in TABLES}
+        # dimension rows looked up in the DimensionCache this batch, and whether they were known
+        self.checked: Dict[Table, Dict[Tuple, bool]] = {table: {} for table in DIMENSION_TABLES}
+        self.counts: Dict[str, int] = {table.name: 0 for table in TABLES}
+        # games to remove, and games whose player and team rows are replaced, before the batch is written
+        self.deleted: Set[str] = set()
+        self.replaced: Set[str] = set()
+
+    def add(self, game: parsers.Game):
+        for table, rows in game_rows(game).items():
+            batch = self.batch[table]
+            dimension = self.dimensions is not None and table in DIMENSION_TABLES
+            checked = self.checked[table] if dimension else None
+            for row in rows:
+                if dimension:
+                    # each player and team once per batch, so the hit rates count rows rather than games
+                    known = checked.get(row)
+                    if known is None:
+                        known = checked[row] = self.dimensions.known(table.name, *row)
+                    if known:
+                        continue
+                # one row per key in a batch: the last one wins, as it would row by row
+                batch[table.row_key(row)] = row
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def delete(self, gameid: str):
+        self.deleted.add(gameid)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def replace(self, game: parsers.Game):
+        self.replaced.add(game.gameid)
+        self.add(game)
+
+    def flush(self):
+        if not self.pending:
+            return
+        try:
+            if self.deleted or self.replaced:
+                for table in GAME_TABLES:
+                    self.backend.delete(table, self.deleted | self.replaced)
+                self.backend.delete(GAMES, self.deleted)
+            for table in TABLES:
+                rows = list(self.batch[table].values())
+                if rows:
+                    self.backend.write(table, rows)
+                    self.counts[table.name] += len(rows)
+            self.backend.commit()
+        except Exception:
+            self.backend.rollback()
+            raise
+        if self.dimensions is not None:
+            # only once they are committed
+            for table in DIMENSION_TABLES:
+                self.dimensions.record(table.name, self.batch[table].values())
+        for batch in self.batch.values():
+            batch.clear()
+        for checked in self.checked.values():
+            checked.clear()
+        self.deleted.clear()
+        self.replaced.clear()
+        self.pending = 0
+
+    def load(self, games: Iterable[parsers.Game]) -> Dict[str, int]:
+        '''
+        Loads games and returns the number of rows written to each table
+        '''
+        for game in games:
+            self.add(game)
+        self.flush()
+        if self.dimensions is not None:
+            self.dimensions.save()
+        return self.counts
+
+    def apply(self, items: Iterable[changes.Change]) -> Dict[str, int]:
+        '''
+        Applies changes and returns the number of rows written to each table
+        '''
+        for change in items:
+            if change.kind == changes.DELETED:
+                self.delete(change.gameid)
+            elif change.kind == changes.UPDATED:
+                self.replace(change.game)
+            else:
+                self.add(change.game)
+        counts = self.load([])
+        if isinstance(items, changes.ChangeIterator):
+            items.commit()
+        return counts
+
+
+def load_csv(latest: datetime, input, backend, batch_size: int = BATCH_SIZE,
+             dimensions: DimensionCache = None) -> Dict[str, int]:
+    return Loader(backend, batch_size, dimensions).load(iterfactory.csv_game_iterator(latest, input))
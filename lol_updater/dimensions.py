@@ -0,0 +1,114 @@
+import json
+from typing import Dict, Iterable, Optional, Tuple
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+
+from . import utils
+
+CACHE_SIZE = 100000
+DIMENSIONS = ('players', 'teams')
+
+
+@dataclass
+class CacheStats:
+    # rows already known with the same name
+    hits: int = 0
+    # ids never seen before (or forgotten)
+    misses: int = 0
+    # known ids with a new name
+    changes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.changes
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict:
+        return dict(asdict(self), hit_rate=self.hit_rate)
+
+
+class LRUCache:
+    '''
+    Bounded mapping that forgets the least recently used keys first
+    '''
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key) -> bool:
+        return key in self.items
+
+    def get(self, key, default=None):
+        if key not in self.items:
+            return default
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+
+class DimensionCache:
+    '''
+    Remembers the id -> name of every player and team written to the database
+    so that the loader only writes new players and teams, or ones whose name changed.
+
+    Ids include the slugified names used for rows without an id.
+    The cache is kept in a json file at path between runs.
+    '''
+
+    def __init__(self, path=None, maxsize: int = CACHE_SIZE):
+        self.path = Path(path) if path is not None else None
+        self.caches: Dict[str, LRUCache] = {name: LRUCache(maxsize) for name in DIMENSIONS}
+        self.stats: Dict[str, CacheStats] = {name: CacheStats() for name in DIMENSIONS}
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def known(self, dimension: str, key: str, name: str) -> bool:
+        '''
+        Whether key is already stored with name
+        '''
+        cached = self.caches[dimension].get(key)
+        stats = self.stats[dimension]
+        if cached is None:
+            stats.misses += 1
+            return False
+        elif cached != name:
+            stats.changes += 1
+            return False
+        stats.hits += 1
+        return True
+
+    def record(self, dimension: str, rows: Iterable[Tuple[str, str]]):
+        '''
+        Remembers (id, name) rows once they have been written
+        '''
+        cache = self.caches[dimension]
+        for key, name in rows:
+            cache.put(key, name)
+
+    def load(self):
+        with open(self.path, 'r') as finput:
+            data = json.load(finput)
+        for name in DIMENSIONS:
+            self.record(name, data.get(name, []))
+
+    def save(self):
+        if self.path is None:
+            return
+        # least recently used first, so that loading restores the order
+        utils.atomic_write_json(self.path, {name: list(cache.items.items()) for name, cache in self.caches.items()})
+
+    def hit_rates(self) -> Dict[str, Dict]:
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def get(self, dimension: str, key: str) -> Optional[str]:
+        return self.caches[dimension].get(key)
@@ -1,5 +1,8 @@
-from typing import Iterable, Dict
+from typing import Iterable, Dict, List, Sequence
 from datetime import datetime
+from operator import itemgetter
+
+from . import metrics
 
 
 class Latest:
@@ -14,7 +17,65 @@ class Latest:
         self.rows = rows
 
     def __iter__(self) -> Iterable[Dict]:
+        if metrics.registry.enabled:
+            yield from self.counted()
+            return
         for row in self.rows:
             dt = self.parser(row[self.attr])
             if dt and dt > self.dt:
                 yield row
+
+    def counted(self) -> Iterable[Dict]:
+        '''
+        __iter__, counting the rows read and skipped into the metrics registry
+        '''
+        read = skipped = 0
+        try:
+            for row in self.rows:
+                read += 1
+                dt = self.parser(row[self.attr])
+                if dt and dt > self.dt:
+                    yield row
+                else:
+                    skipped += 1
+        finally:
+            metrics.registry.incr('rows_read', read)
+            metrics.registry.incr('rows_skipped', skipped)
+
+
+class Columns:
+    '''
+    Wraps a csv reader to yield dicts of only the named columns.
+
+    Column positions are looked up in the header once, so each row costs a small dict of the
+    columns we need rather than csv.DictReader's dict of every column in the file.
+    Like csv.DictReader, blank rows are skipped and short rows padded with None.
+    '''
+
+    def __init__(self, rows: Iterable[List[str]], columns: Sequence[str]):
+        self.rows = rows
+        self.columns = tuple(columns)
+
+    def __iter__(self) -> Iterable[Dict]:
+        rows = iter(self.rows)
+        header = next(rows, None)
+        if header is None:
+            return
+        # later duplicates win, as they do in csv.DictReader
+        positions = {name: i for i, name in enumerate(header)}
+        columns = tuple(column for column in self.columns if column in positions)
+        indexes = [positions[column] for column in columns]
+        if len(indexes) > 1:
+            getter = itemgetter(*indexes)
+        elif indexes:
+            getter = lambda row: (row[indexes[0]],)
+        else:
+            # none of the columns is in the file: an empty dict per row, as missing columns are skipped
+            getter = lambda row: ()
+        width = max(indexes, default=-1) + 1
+        for row in rows:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [None] * (width - len(row))
+            yield dict(zip(columns, getter(row)))
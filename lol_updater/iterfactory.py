@@ -1,17 +1,57 @@
 import csv
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Sequence
 
+from . import changes
+from . import compression
 from . import iterators
+from . import parallel
 from . import parsers
 
 
-def csv_latest_iterator(latest: datetime, input) -> iterators.Latest:
+def csv_latest_iterator(latest: datetime, input, columns: Sequence[str] = None) -> iterators.Latest:
+    '''
+    Rows newer than latest, as dicts of every column or of just the given columns
+    '''
+    if columns is None:
+        rows = csv.DictReader(input)
+    else:
+        rows = iterators.Columns(csv.reader(input), columns)
     return iterators.Latest(
         latest,
-        csv.DictReader(input),
+        rows,
         parsers.parse_dt
     )
 
 
-def csv_game_iterator(latest: datetime, input):
-    return parsers.GameIterator(csv_latest_iterator(latest, input))
+def csv_game_iterator(latest: datetime, input, registry: parsers.Registry = None, lazy: bool = False):
+    return parsers.GameIterator(csv_latest_iterator(latest, input, parsers.COLUMNS), registry, lazy)
+
+
+def csv_file_game_iterator(latest: datetime, path, registry: parsers.Registry = None):
+    '''
+    Games from a csv file that may be compressed (gzip, bz2, xz or zstd), decompressed as it is read
+    '''
+    return csv_game_iterator(latest, compression.lines(path), registry)
+
+
+def csv_reordering_game_iterator(latest: datetime, input, window: int = parsers.REORDER_WINDOW,
+                                 horizon: timedelta = None, registry: parsers.Registry = None):
+    '''
+    Games from a csv whose rows for one game may be interleaved with other games' rows
+    '''
+    return parsers.ReorderingGameIterator(
+        csv_latest_iterator(latest, input, parsers.COLUMNS), window, horizon, registry
+    )
+
+
+def csv_parallel_game_iterator(latest: datetime, path, workers: int = None) -> parallel.ParallelGameIterator:
+    return parallel.ParallelGameIterator(latest, path, workers)
+
+
+def csv_change_iterator(input, store: changes.DigestStore, registry: parsers.Registry = None) -> changes.ChangeIterator:
+    '''
+    Games inserted, updated or deleted in the csv since store was last saved.
+    input has to be the whole file, as every game missing from it counts as deleted
+    '''
+    return changes.ChangeIterator(csv_game_iterator(datetime.min, input, registry), store)
@@ -1,15 +1,22 @@
+import io
 import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator
 from dataclasses import dataclass, field
 
 import requests
 
+from . import metrics
+
 MATCH_DATA_URL = 'https://oe.datalisk.io/matchData'
 USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64; rv:101.0) Gecko/20100101 Firefox/101.0'
 DT_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
+# bytes requested from the socket per read when streaming
+CHUNK_SIZE = 1024 * 1024
 
 
 def parse_dt(value: str) -> datetime:
+    if len(value) == 24 and value.endswith('.000Z') and value[10] == 'T' and value[13] == value[16] == ':':
+        return datetime.datetime.fromisoformat(value[:19])
     return datetime.datetime.strptime(value, DT_FORMAT)
 
 
@@ -59,8 +66,43 @@ def latest_link(links: List[Link]) -> Link:
     return None
 
 
-def download_games(url: str) -> List[str]:
-    req = requests.get(url)
+def download_games(url: str, stream: bool = False, session: requests.Session = None) -> Iterable[str]:
+    '''
+    The lines of the csv file at url: a list, or with stream set the stream_games iterator
+    '''
+    if stream:
+        return stream_games(url, session=session)
+    req = (session or requests).get(url)
     if req.status_code == 200:
+        if metrics.registry.enabled:
+            metrics.registry.incr('bytes_downloaded', len(req.content))
         return req.text.splitlines()
     return []
+
+
+def stream_games(url: str, chunk_size: int = CHUNK_SIZE, session: requests.Session = None) -> Iterator[str]:
+    '''
+    Yields the lines of the csv file at url as they arrive.
+
+    Only one buffered chunk of the response is held in memory at a time,
+    so the result can be handed straight to csv.DictReader regardless of file size.
+    '''
+    req = (session or requests).get(url, stream=True)
+    try:
+        if req.status_code != 200:
+            return
+        # let urllib3 undo any content encoding (gzip) as we read and
+        # keep the raw stream open at eof so the text wrapper can see it
+        req.raw.decode_content = True
+        req.raw.auto_close = False
+        lines = io.TextIOWrapper(
+            io.BufferedReader(req.raw, chunk_size),
+            encoding=req.encoding or 'utf-8',
+            newline=''
+        )
+        yield from lines
+    finally:
+        if metrics.registry.enabled and req.status_code == 200:
+            # bytes read off the wire, before any content decoding
+            metrics.registry.incr('bytes_downloaded', req.raw.tell())
+        req.close()
@@ -0,0 +1,112 @@
+import io
+import os
+import csv
+from collections import deque
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+from . import iterators
+from . import parsers
+
+ENCODING = 'utf-8'
+# ranges handed out per worker, so that a slow range does not leave the others idle
+RANGES_PER_WORKER = 4
+
+
+def row_gameid(line: bytes, column: int) -> Optional[str]:
+    '''
+    gameid of the csv row in line, None for a blank line
+    '''
+    row = next(csv.reader([line.decode(ENCODING)]), None)
+    return row[column] if row and len(row) > column else None
+
+
+def game_boundary(fp: BinaryIO, offset: int, column: int) -> Optional[int]:
+    '''
+    Offset of the first line at or after offset that starts a new game, None if there is none.
+
+    Rows are located by line, so this relies on there being no line breaks inside quoted fields,
+    which is the case for the match data files.
+    '''
+    # step back one byte so that an offset already at the start of a line is kept
+    fp.seek(offset - 1)
+    fp.readline()
+    gameid = None
+    while True:
+        position = fp.tell()
+        line = fp.readline()
+        if not line:
+            return None
+        current = row_gameid(line, column)
+        if current is None:
+            # blank lines belong to no game
+            continue
+        if gameid is None:
+            gameid = current
+        elif current != gameid:
+            return position
+
+
+def split_ranges(path, parts: int) -> List[Tuple[int, int]]:
+    '''
+    Splits the rows of the csv file at path into at most parts byte ranges
+    that each hold whole games
+    '''
+    with open(path, 'rb') as finput:
+        header = finput.readline()
+        column = next(csv.reader([header.decode(ENCODING)])).index('gameid')
+        start = len(header)
+        size = os.fstat(finput.fileno()).st_size
+        boundaries = [start]
+        for i in range(1, parts):
+            target = start + (size - start) * i // parts
+            if target <= boundaries[-1]:
+                continue
+            boundary = game_boundary(finput, target, column)
+            if boundary is None:
+                break
+            boundaries.append(boundary)
+    boundaries.append(size)
+    return [(a, b) for a, b in zip(boundaries, boundaries[1:]) if b > a]
+
+
+def parse_range(path, start: int, end: int, latest: datetime) -> List[parsers.Game]:
+    with open(path, 'rb') as finput:
+        fieldnames = next(csv.reader([finput.readline().decode(ENCODING)]))
+        finput.seek(start)
+        data = finput.read(end - start).decode(ENCODING)
+    rows = iterators.Columns(chain([fieldnames], csv.reader(io.StringIO(data, newline=''))), parsers.COLUMNS)
+    return list(parsers.GameIterator(
+        iterators.Latest(latest, rows, parsers.parse_dt)
+    ))
+
+
+class ParallelGameIterator:
+    '''
+    Parses the csv file at path in a pool of worker processes and yields its games in file order.
+
+    The file is split into byte ranges on game boundaries so no game is shared between workers.
+    At most 2 * workers ranges are in flight at a time, which bounds the parsed games held in memory.
+    '''
+
+    def __init__(self, latest: datetime, path, workers: int = None, ranges_per_worker: int = RANGES_PER_WORKER):
+        self.latest = latest
+        self.path = path
+        self.workers = workers or os.cpu_count()
+        self.ranges_per_worker = ranges_per_worker
+
+    def __iter__(self) -> Iterable[parsers.Game]:
+        ranges = deque(split_ranges(self.path, self.workers * self.ranges_per_worker))
+        pending = deque()
+        pool = ProcessPoolExecutor(self.workers)
+        try:
+            while ranges or pending:
+                while ranges and len(pending) < 2 * self.workers:
+                    start, end = ranges.popleft()
+                    pending.append(pool.submit(parse_range, self.path, start, end, self.latest))
+                yield from pending.popleft().result()
+        finally:
+            # a consumer that stops early should not wait for ranges it will never read
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,21 +1,46 @@
+import sys
 from itertools import chain
-from typing import Iterable, Dict, Any, List
-from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
 from collections import OrderedDict
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+
+from . import metrics
 
 INPUT_DT_FORMAT = '%Y-%m-%dT%H:%M:%S'
 EA_DT_FORMAT = '%Y-%m-%d %H:%M:%S'
 # if we need date times to generate a game id
 GAME_ID_FORMAT = '%Y-%m-%d_%H-%M'
+# rows that make up a complete game
+PLAYERS_PER_GAME = 10
+TEAMS_PER_GAME = 2
+# games ReorderingGameIterator holds at most while waiting for their rows
+REORDER_WINDOW = 64
+# dataclasses can only generate __slots__ from python 3.10 on
+SLOTS = dict(slots=True) if sys.version_info >= (3, 10) else {}
 
 
 def slugify(value: str) -> str:
     return value.replace(' ', '-').lower()
 
 
+@lru_cache(maxsize=256)
 def parse_dt(value: str) -> datetime:
+    # all the rows of a game share a date, so most calls are answered by the cache
+    if value is None:
+        return None
+    # both input formats are fixed width iso layouts, which fromisoformat reads much faster than strptime
+    if len(value) == 19 and value[10] in 'T ' and value[4] == value[7] == '-' and value[13] == value[16] == ':':
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return parse_dt_strptime(value)
+
+
+def parse_dt_strptime(value: str) -> datetime:
     if value is None:
         return None
     for fmt in (INPUT_DT_FORMAT, EA_DT_FORMAT):
@@ -62,18 +87,50 @@ def make_game_id(league: str, date: datetime, game: int) -> str:
     return f'{league}_{date.strftime(GAME_ID_FORMAT)}_{game}'
 
 
-@dataclass
+class Registry:
+    '''
+    Hands out one shared instance of each distinct player, team and repeated string seen during a run
+    '''
+
+    def __init__(self):
+        self.players: Dict[Tuple[str, str], 'Player'] = {}
+        self.teams: Dict[Tuple[str, str], 'Team'] = {}
+        self.strings: Dict[str, str] = {}
+
+    def string(self, value: str) -> str:
+        if value is None:
+            return None
+        return self.strings.setdefault(value, value)
+
+    def player(self, playerid: str, name: str) -> 'Player':
+        key = (playerid, name)
+        player = self.players.get(key)
+        if player is None:
+            player = self.players[key] = Player(self.string(playerid), self.string(name))
+        return player
+
+    def team(self, teamid: str, name: str) -> 'Team':
+        key = (teamid, name)
+        team = self.teams.get(key)
+        if team is None:
+            team = self.teams[key] = Team(self.string(teamid), self.string(name))
+        return team
+
+
+@dataclass(frozen=True, **SLOTS)
 class Player:
 
     playerid: str
     name: str
 
     @classmethod
-    def from_row(cls, row: Dict):
+    def from_row(cls, row: Dict, registry: Registry = None):
         playerid = parse_id(row['playerid'])
         name = parse_str(row['playername'], 'Unknown')
         if playerid is None:
             playerid = slugify(name)
+        if registry is not None:
+            return registry.player(playerid, name)
         return cls(
             playerid,
             name
@@ -93,18 +150,20 @@ class Player:
         )
 
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class Team:
 
     teamid: str
     name: str
 
     @classmethod
-    def from_row(cls, row: Dict):
+    def from_row(cls, row: Dict, registry: Registry = None):
         teamid = parse_id(row['teamid'])
         name = parse_str(row['teamname'], 'Unknown')
         if teamid is None:
             teamid = slugify(name)
+        if registry is not None:
+            return registry.team(teamid, name)
         return cls(
             teamid,
             name
@@ -124,7 +183,7 @@ class Team:
         )
 
 
-@dataclass
+@dataclass(**SLOTS)
 class PlayerGame:
     player: Player
     position: str
@@ -136,6 +195,16 @@ class PlayerGame:
     totalgold: int = 0
     golddiffat15: int = 0
 
+    INT_ATTRS = (
+        'kills',
+        'deaths',
+        'assists',
+        'damagetochampions',
+        'visionscore',
+        'totalgold',
+        'golddiffat15',
+    )
+
     @classmethod
     def from_dict(cls, data: Dict):
         item = cls(
@@ -146,9 +215,11 @@ class PlayerGame:
         return item
 
     @classmethod
-    def from_row(cls, row: Dict):
-        player = Player.from_row(row)
+    def from_row(cls, row: Dict, registry: Registry = None):
+        player = Player.from_row(row, registry)
         position = parse_str(row['position'])
+        if registry is not None:
+            position = registry.string(position)
         item = cls(
             player,
             position
@@ -170,11 +241,11 @@ class PlayerGame:
         )
 
     def set_int_attrs(self, data: Dict):
-        for attr in ('kills', 'deaths', 'assists', 'damagetochampions', 'visionscore', 'totalgold', 'golddiffat15'):
+        for attr in self.INT_ATTRS:
             setattr(self, attr, parse_int(data[attr]))
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TeamGame:
     team: Team
     side: str
@@ -215,9 +286,11 @@ class TeamGame:
         return item
 
     @classmethod
-    def from_row(cls, row: Dict):
-        team = Team.from_row(row)
+    def from_row(cls, row: Dict, registry: Registry = None):
+        team = Team.from_row(row, registry)
         side = parse_str(row['side'])
+        if registry is not None:
+            side = registry.string(side)
         item = cls(
             team,
             side,
@@ -244,12 +317,12 @@ class TeamGame:
             setattr(self, attr, parse_int(data[attr]))
 
     def get_attrs(self) -> Dict:
-        return dict([
-            (attr, getattr(self, attr)) for attr in chain(self.INT_ATTRS, self.BOOL_ATTRS)
-        ])
+        return {
+            attr: getattr(self, attr) for attr in chain(self.INT_ATTRS, self.BOOL_ATTRS)
+        }
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Game:
 
     gameid: str
@@ -264,16 +337,20 @@ class Game:
     teamgames: List[TeamGame] = field(init=False, default_factory=list)
 
     @classmethod
-    def from_row(cls, row: Dict):
+    def from_row(cls, row: Dict, registry: Registry = None):
         gameid = row['gameid']
         date = parse_dt(row['date'])
         duration = parse_int(row['gamelength'])
         league = parse_str(row['league'])
         split = parse_str(row['split'])
         game = parse_int(row['game'], default=1)
-        position = parse_str(row['position']).lower()
+        status = parse_str(row['datacompleteness'])
         if gameid is None:
             gameid = make_game_id(league, date, game)
+        if registry is not None:
+            league = registry.string(league)
+            split = registry.string(split)
+            status = registry.string(status)
         game = cls(
             gameid,
             date,
@@ -282,14 +359,20 @@ class Game:
             league,
             split,
             parse_bool(row['playoffs']),
-            parse_str(row['datacompleteness'])
+            status
         )
-        if position == 'team':
-            game.teamgames.append(TeamGame.from_row(row))
-        else:
-            game.playergames.append(PlayerGame.from_row(row))
+        game.add_row(row, registry)
         return game
 
+    def add_row(self, row: Dict, registry: Registry = None):
+        '''
+        Adds the player or team stats in row to this game
+        '''
+        if parse_str(row['position']).lower() == 'team':
+            self.teamgames.append(TeamGame.from_row(row, registry))
+        else:
+            self.playergames.append(PlayerGame.from_row(row, registry))
+
     @classmethod
     def from_dict(cls, data: Dict):
         game = cls(
@@ -324,27 +407,217 @@ class Game:
             teamgames=[t.as_dict() for t in self.teamgames]
         )
 
+    @property
+    def winner(self) -> Optional[Team]:
+        for teamgame in self.teamgames:
+            if teamgame.win:
+                return teamgame.team
+        return None
+
+
+class LazyGame(Game):
+    '''
+    A Game that keeps its raw player and team rows and only parses them into playergames and teamgames
+    the first time either is used. winner is found without parsing the player rows.
+
+    Compares equal to the eager Game built from the same rows.
+    '''
+
+    __slots__ = ('rows', 'registry', '_playergames', '_teamgames')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rows: List[Dict] = []
+        self.registry: Registry = None
+        # None until the rows are parsed
+        self._playergames: List[PlayerGame] = None
+        self._teamgames: List[TeamGame] = None
+
+    def add_row(self, row: Dict, registry: Registry = None):
+        if self._playergames is None:
+            self.rows.append(row)
+            self.registry = registry
+        else:
+            super().add_row(row, registry)
+
+    def decode(self):
+        if self._playergames is not None:
+            return
+        self._playergames = []
+        self._teamgames = []
+        rows, self.rows = self.rows, []
+        for row in rows:
+            super().add_row(row, self.registry)
+
+    @property
+    def decoded(self) -> bool:
+        return self._playergames is not None
+
+    @property
+    def playergames(self) -> List[PlayerGame]:
+        self.decode()
+        return self._playergames
+
+    @playergames.setter
+    def playergames(self, value: List[PlayerGame]):
+        self._playergames = value
+
+    @property
+    def teamgames(self) -> List[TeamGame]:
+        self.decode()
+        return self._teamgames
+
+    @teamgames.setter
+    def teamgames(self, value: List[TeamGame]):
+        self._teamgames = value
+
+    @property
+    def winner(self) -> Optional[Team]:
+        if self.decoded:
+            return super().winner
+        for row in self.rows:
+            if parse_str(row['position']).lower() == 'team' and parse_bool(row['result']):
+                return Team.from_row(row, self.registry)
+        return None
+
+    def __eq__(self, other):
+        if not isinstance(other, Game):
+            return NotImplemented
+        return all(getattr(self, item.name) == getattr(other, item.name) for item in fields(Game))
+
+
+# every column read by the from_row constructors
+COLUMNS = (
+    'gameid',
+    'date',
+    'gamelength',
+    'league',
+    'split',
+    'game',
+    'playoffs',
+    'datacompleteness',
+    'position',
+    'playerid',
+    'playername',
+    'teamid',
+    'teamname',
+    'side',
+    'result',
+) + PlayerGame.INT_ATTRS + TeamGame.INT_ATTRS + TeamGame.BOOL_ATTRS
+
 
 class GameIterator:
+    '''
+    Assembles games from rows that come grouped by game. With lazy set the games are LazyGames
+    '''
 
-    def __init__(self, rows: Iterable[Dict]):
+    def __init__(self, rows: Iterable[Dict], registry: Registry = None, lazy: bool = False):
         self.rows = rows
+        self.registry = registry
+        self.lazy = lazy
         self.current_game: Game = None
 
     def __iter__(self) -> Iterable[Game]:
-        for row in self.rows:
-            game: Game = Game.from_row(row)
-            if self.current_game is None:
-                self.current_game = game
-            elif game.gameid == self.current_game.gameid:
-                # same game - update the team and player games
-                self.current_game.playergames.extend(game.playergames)
-                self.current_game.teamgames.extend(game.teamgames)
-            else:
-                # its new. yield what we have
+        cls = LazyGame if self.lazy else Game
+        from_row = cls.from_row
+        add_row = cls.add_row
+        enabled = metrics.registry.enabled
+        if enabled:
+            from_row = metrics.registry.timed('game_from_row', from_row)
+            add_row = metrics.registry.timed('game_add_row', add_row)
+        emitted = 0
+        try:
+            for row in self.rows:
+                gameid = row['gameid']
+                if self.current_game is not None and gameid is not None and gameid == self.current_game.gameid:
+                    # same game - the game level columns are already parsed, just add the team or player stats
+                    add_row(self.current_game, row, self.registry)
+                    continue
+                game: Game = from_row(row, self.registry)
+                if self.current_game is None:
+                    self.current_game = game
+                elif game.gameid == self.current_game.gameid:
+                    # same generated game id
+                    self.current_game.playergames.extend(game.playergames)
+                    self.current_game.teamgames.extend(game.teamgames)
+                else:
+                    # its new. yield what we have
+                    emitted += 1
+                    yield self.current_game
+                    # start a new game
+                    self.current_game = game
+            # don't forget the last one
+            if self.current_game is not None:
+                emitted += 1
                 yield self.current_game
-                # start a new game
-                self.current_game = game
-        # don't forget the last one
-        if self.current_game is not None:
-            yield self.current_game
+        finally:
+            if enabled:
+                metrics.registry.incr('games_emitted', emitted)
+
+
+class ReorderingGameIterator:
+    '''
+    Assembles games from rows that need not be contiguous, keeping unfinished games in a buffer
+    keyed by gameid.
+
+    A game is yielded as soon as it has all its player and team rows, so games can come out
+    in a different order than their first rows. An unfinished game is yielded anyway (and counted
+    in evicted) once more than window games are waiting, or, with a horizon, once the oldest waiting
+    game is more than horizon older than the newest date seen. Rows arriving after their game was
+    yielded start a new, partial game.
+    '''
+
+    def __init__(self, rows: Iterable[Dict], window: int = REORDER_WINDOW, horizon: timedelta = None,
+                 registry: Registry = None):
+        self.rows = rows
+        self.window = window
+        self.horizon = horizon
+        self.registry = registry
+        self.buffer: OrderedDict = OrderedDict()
+        # games yielded before all their rows arrived
+        self.evicted = 0
+
+    def __iter__(self) -> Iterable[Game]:
+        buffer = self.buffer
+        newest = datetime.min
+        emitted = 0
+        try:
+            for row in self.rows:
+                game: Game = buffer.get(row['gameid'])
+                if game is not None:
+                    game.add_row(row, self.registry)
+                else:
+                    game = Game.from_row(row, self.registry)
+                    waiting = buffer.get(game.gameid)
+                    if waiting is None:
+                        buffer[game.gameid] = game
+                    else:
+                        # same generated game id
+                        waiting.playergames.extend(game.playergames)
+                        waiting.teamgames.extend(game.teamgames)
+                        game = waiting
+                if len(game.playergames) >= PLAYERS_PER_GAME and len(game.teamgames) >= TEAMS_PER_GAME:
+                    del buffer[game.gameid]
+                    emitted += 1
+                    yield game
+                    continue
+                while len(buffer) > self.window:
+                    self.evicted += 1
+                    emitted += 1
+                    yield buffer.popitem(last=False)[1]
+                if self.horizon is not None and game.date is not None and game.date > newest:
+                    newest = game.date
+                    while buffer:
+                        oldest: Game = next(iter(buffer.values()))
+                        if oldest.date is None or newest - oldest.date <= self.horizon:
+                            break
+                        self.evicted += 1
+                        emitted += 1
+                        yield buffer.popitem(last=False)[1]
+            # whatever is left never got all its rows
+            while buffer:
+                emitted += 1
+                yield buffer.popitem(last=False)[1]
+        finally:
+            if metrics.registry.enabled:
+                metrics.registry.incr('games_emitted', emitted)
@@ -0,0 +1,188 @@
+import csv
+import queue
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from datetime import datetime
+from dataclasses import dataclass, asdict
+
+from . import iterators
+from . import parsers
+
+# batches waiting between two stages
+QUEUE_SIZE = 16
+# items passed between stages in one queue operation
+BATCH_SIZE = 256
+# how often a blocked stage checks whether the pipeline was stopped
+POLL_INTERVAL = 0.1
+
+Stage = Tuple[str, Callable[[Iterable], Iterable]]
+
+
+@dataclass
+class StageStats:
+    name: str
+    # items the stage produced
+    items: int = 0
+    # seconds spent in the stage body
+    busy: float = 0.0
+    # seconds waiting for input
+    starved: float = 0.0
+    # seconds waiting for room downstream (backpressure)
+    blocked: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+class Failed:
+    '''
+    Sent downstream in place of a batch when a stage raises
+    '''
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+DONE = object()
+
+
+class QueueInput:
+    '''
+    Iterates over the items of the batches arriving on a queue, timing the waits.
+    Ends early once stopped is set
+    '''
+
+    def __init__(self, input: queue.Queue, stats: StageStats, stopped: threading.Event):
+        self.input = input
+        self.stats = stats
+        self.stopped = stopped
+
+    def get(self):
+        start = time.perf_counter()
+        try:
+            while not self.stopped.is_set():
+                try:
+                    return self.input.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+            return DONE
+        finally:
+            self.stats.starved += time.perf_counter() - start
+
+    def __iter__(self) -> Iterator:
+        while True:
+            batch = self.get()
+            if batch is DONE:
+                return
+            if isinstance(batch, Failed):
+                raise batch.error
+            yield from batch
+
+
+class Pipeline:
+    '''
+    Runs source and each stage body in its own thread, connected by bounded queues.
+
+    A stage body takes an iterable and returns an iterable, so the existing iterator classes
+    (csv.DictReader, iterators.Latest, parsers.GameIterator) can be used as they are.
+    Full queues block the stages upstream of them, and stats records for each stage how long
+    it worked, waited for input and waited on the stage after it.
+    '''
+
+    def __init__(self, source: Iterable, stages: List[Stage], maxsize: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE):
+        self.source = source
+        self.stages = stages
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+        self.stats: List[StageStats] = [StageStats('source')] + [StageStats(name) for name, _ in stages]
+
+    def put(self, output: queue.Queue, item, stats: StageStats) -> bool:
+        start = time.perf_counter()
+        try:
+            while not self.stopped.is_set():
+                try:
+                    output.put(item, timeout=POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        finally:
+            stats.blocked += time.perf_counter() - start
+
+    def run_stage(self, make_items: Callable[[], Iterable], output: queue.Queue, stats: StageStats):
+        start = time.perf_counter()
+        batch = []
+        try:
+            for item in make_items():
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    stats.items += len(batch)
+                    if not self.put(output, batch, stats):
+                        return
+                    batch = []
+            stats.items += len(batch)
+            if batch and not self.put(output, batch, stats):
+                return
+            self.put(output, DONE, stats)
+        except BaseException as error:
+            self.put(output, Failed(error), stats)
+        finally:
+            stats.busy = time.perf_counter() - start - stats.starved - stats.blocked
+
+    def __iter__(self) -> Iterator:
+        queues = [queue.Queue(self.maxsize) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(
+            target=self.run_stage, args=(lambda: self.source, queues[0], self.stats[0]), daemon=True
+        )]
+        for i, (_, body) in enumerate(self.stages):
+            stats = self.stats[i + 1]
+            make_items = partial(body, QueueInput(queues[i], stats, self.stopped))
+            threads.append(threading.Thread(
+                target=self.run_stage, args=(make_items, queues[i + 1], stats), daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+        try:
+            yield from QueueInput(queues[-1], StageStats('output'), self.stopped)
+        finally:
+            # let any stage still running (e.g. when the caller stopped early) give up
+            self.stopped.set()
+            for thread in threads:
+                thread.join()
+
+    def run(self) -> int:
+        '''
+        Runs the pipeline to the end and returns the number of items it produced
+        '''
+        count = 0
+        for _ in self:
+            count += 1
+        return count
+
+
+def sink(write: Callable) -> Callable[[Iterable], Iterable]:
+    '''
+    Stage body that passes each item to write and produces nothing
+    '''
+    def body(items: Iterable) -> Iterator:
+        for item in items:
+            write(item)
+        yield from ()
+    return body
+
+
+def game_pipeline(latest: datetime, lines: Iterable[str], write: Callable = None, **kwargs) -> Pipeline:
+    '''
+    download (lines) -> csv decode and Latest -> GameIterator [-> write]
+    '''
+    stages: List[Stage] = [
+        ('decode', lambda lines: iterators.Latest(
+            latest, iterators.Columns(csv.reader(lines), parsers.COLUMNS), parsers.parse_dt)),
+        ('assemble', parsers.GameIterator),
+    ]
+    if write is not None:
+        stages.append(('sink', sink(write)))
+    return Pipeline(lines, stages, **kwargs)
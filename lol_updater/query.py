@@ -0,0 +1,151 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from datetime import datetime
+
+from . import parsers
+
+
+class Results:
+    '''
+    The games matching a query, in date order. Games are only looked up as they are iterated
+    '''
+
+    def __init__(self, index: 'GameIndex', positions: List[int]):
+        self.index = index
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[parsers.Game]:
+        games = self.index.games
+        for position in self.positions:
+            yield games[position]
+
+
+class GameIndex:
+    '''
+    Games held in memory with secondary indexes on league, split, playoffs, players and teams
+    (value -> positions) and a sorted date index, filled in as games are added.
+
+    query() intersects the position sets of the given filters, smallest first, so its cost follows the
+    number of matching games rather than the number of games held. Adding a game whose gameid is
+    already held replaces it.
+    '''
+
+    def __init__(self, games: Iterable[parsers.Game] = ()):
+        self.games: List[Optional[parsers.Game]] = []
+        self.positions: Dict[str, int] = {}
+        self.leagues: Dict[str, Set[int]] = {}
+        self.splits: Dict[str, Set[int]] = {}
+        self.playoffs: Dict[bool, Set[int]] = {}
+        self.players: Dict[str, Set[int]] = {}
+        self.teams: Dict[str, Set[int]] = {}
+        # (date, position) in date order
+        self.dates: List[tuple] = []
+        # whether positions are in date order too, as they are when games are added in date order
+        self.ordered = True
+        self.update(games)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def keys(self, game: parsers.Game):
+        yield self.leagues, game.league
+        yield self.splits, game.split
+        yield self.playoffs, game.playoffs
+        for playerid in {playergame.player.playerid for playergame in game.playergames}:
+            yield self.players, playerid
+        for teamid in {teamgame.team.teamid for teamgame in game.teamgames}:
+            yield self.teams, teamid
+
+    def add(self, game: parsers.Game):
+        position = self.positions.get(game.gameid)
+        if position is not None:
+            self.remove(position)
+        position = len(self.games)
+        self.games.append(game)
+        self.positions[game.gameid] = position
+        for index, key in self.keys(game):
+            positions = index.get(key)
+            if positions is None:
+                positions = index[key] = set()
+            positions.add(position)
+        entry = (game.date, position)
+        if not self.dates or self.dates[-1] <= entry:
+            # games mostly arrive in date order
+            self.dates.append(entry)
+        else:
+            insort(self.dates, entry)
+            self.ordered = False
+
+    def remove(self, position: int):
+        game = self.games[position]
+        for index, key in self.keys(game):
+            index[key].discard(position)
+        del self.dates[bisect_left(self.dates, (game.date, position))]
+        del self.positions[game.gameid]
+        self.games[position] = None
+
+    def update(self, games: Iterable[parsers.Game]):
+        for game in games:
+            self.add(game)
+
+    def observe(self, games: Iterable[parsers.Game]) -> Iterator[parsers.Game]:
+        '''
+        Passes games through, adding each one on the way
+        '''
+        for game in games:
+            self.add(game)
+            yield game
+
+    def get(self, gameid: str) -> Optional[parsers.Game]:
+        position = self.positions.get(gameid)
+        return None if position is None else self.games[position]
+
+    def date_bounds(self, start: datetime = None, end: datetime = None):
+        lo = 0 if start is None else bisect_left(self.dates, (start,))
+        hi = len(self.dates) if end is None else bisect_left(self.dates, (end,))
+        return lo, hi
+
+    def date_range(self, start: datetime = None, end: datetime = None) -> List[int]:
+        '''
+        Positions of the games from start up to (but not including) end, in date order
+        '''
+        lo, hi = self.date_bounds(start, end)
+        return [position for _, position in self.dates[lo:hi]]
+
+    def query(self, league: str = None, split: str = None, playoffs: bool = None, player: str = None,
+              team: str = None, start: datetime = None, end: datetime = None) -> Results:
+        '''
+        Games matching every filter given (playerid, teamid, and dates from start up to end)
+        '''
+        filters: List[Set[int]] = []
+        for index, key in ((self.leagues, league), (self.splits, split), (self.playoffs, playoffs),
+                           (self.players, player), (self.teams, team)):
+            if key is not None:
+                filters.append(index.get(key, set()))
+        dated = start is not None or end is not None
+        if not filters:
+            return Results(self, self.date_range(start, end))
+        filters.sort(key=len)
+        if dated:
+            lo, hi = self.date_bounds(start, end)
+            if hi - lo < len(filters[0]):
+                # the date range is the most selective filter
+                filters.insert(0, {position for _, position in self.dates[lo:hi]})
+                dated = False
+        matches = set(filters[0])
+        for positions in filters[1:]:
+            if not matches:
+                break
+            matches.intersection_update(positions)
+        games = self.games
+        if dated:
+            matches = {
+                position for position in matches
+                if (start is None or games[position].date >= start) and (end is None or games[position].date < end)
+            }
+        if self.ordered:
+            return Results(self, sorted(matches))
+        return Results(self, sorted(matches, key=lambda position: (games[position].date, position)))
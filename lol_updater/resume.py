@@ -0,0 +1,157 @@
+import os
+import csv
+import json
+import hashlib
+import itertools
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass
+
+from . import iterators
+from . import parsers
+from . import utils
+
+# bytes before the resume offset that must be unchanged for the offset to be trusted
+CHECKSUM_WINDOW = 64 * 1024
+
+
+def prefix_checksum(fp: BinaryIO, offset: int) -> str:
+    '''
+    Digest of the header line and the CHECKSUM_WINDOW bytes leading up to offset.
+
+    The source files are only ever appended to, so if these bytes are unchanged the rows before
+    offset are taken to be the ones we have already seen. Hashing a window rather than the whole
+    prefix keeps the check independent of the size of the file.
+    '''
+    position = fp.tell()
+    try:
+        digest = hashlib.sha1()
+        fp.seek(0)
+        digest.update(fp.readline())
+        start = max(0, offset - CHECKSUM_WINDOW)
+        fp.seek(start)
+        digest.update(fp.read(offset - start))
+        return digest.hexdigest()
+    finally:
+        fp.seek(position)
+
+
+@dataclass
+class ResumeIndex:
+    '''
+    Where the last run stopped reading a yearly file
+    '''
+    offset: int
+    ts: datetime
+    checksum: str
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(
+            data['offset'],
+            datetime.strptime(data['ts'], parsers.INPUT_DT_FORMAT),
+            data['checksum']
+        )
+
+    def as_dict(self) -> Dict:
+        return dict(
+            offset=self.offset,
+            ts=self.ts.strftime(parsers.INPUT_DT_FORMAT),
+            checksum=self.checksum
+        )
+
+    @classmethod
+    def load(cls, path) -> Optional['ResumeIndex']:
+        if not Path(path).exists():
+            return None
+        with open(path, 'r') as finput:
+            return cls.from_dict(json.load(finput))
+
+    def save(self, path):
+        utils.atomic_write_json(path, self.as_dict(), indent=4)
+
+
+class ResumableReader:
+    '''
+    csv.DictReader over a binary file that keeps track of byte offsets.
+
+    Given an index whose checksum still matches the file, reading starts at the indexed offset
+    rather than at the top of the file. `start` and `end` are the offsets of the last row yielded.
+    '''
+
+    def __init__(self, fp: BinaryIO, index: ResumeIndex = None, encoding: str = 'utf-8'):
+        self.fp = fp
+        self.index = index
+        self.encoding = encoding
+        self.resumed = False
+        self.start = 0
+        self.end = 0
+        self.position = 0
+
+    def is_valid(self, index: ResumeIndex) -> bool:
+        size = os.fstat(self.fp.fileno()).st_size
+        return index.offset <= size and prefix_checksum(self.fp, index.offset) == index.checksum
+
+    def lines(self) -> Iterator[str]:
+        for line in iter(self.fp.readline, b''):
+            self.position += len(line)
+            yield line.decode(self.encoding)
+
+    def __iter__(self) -> Iterable[Dict]:
+        self.fp.seek(0)
+        header = self.fp.readline()
+        fieldnames = next(csv.reader([header.decode(self.encoding)]))
+        self.position = len(header)
+        if self.index is not None and self.index.offset > self.position and self.is_valid(self.index):
+            self.position = self.index.offset
+            self.resumed = True
+        self.fp.seek(self.position)
+        self.start = self.end = self.position
+        for row in csv.DictReader(self.lines(), fieldnames):
+            self.start = self.end
+            self.end = self.position
+            yield row
+
+    def make_index(self, ts: datetime) -> ResumeIndex:
+        '''
+        Index pointing just past the last row read
+        '''
+        return ResumeIndex(self.end, ts, prefix_checksum(self.fp, self.end))
+
+
+def unseen_rows(reader: ResumableReader, latest: datetime, rows: Iterable[Dict] = None) -> Iterator[Dict]:
+    '''
+    Rows of reader (or of rows, read through reader) newer than latest. When reading resumes at the
+    indexed offset every row past it is new, so games dated the same as the indexed one are kept
+    '''
+    rows = iter(reader if rows is None else rows)
+    # the reader only decides whether to resume once it has read the header
+    first = next(rows, None)
+    if first is None:
+        return
+    yield from iterators.Latest(datetime.min if reader.resumed else latest, itertools.chain([first], rows),
+                                parsers.parse_dt)
+
+
+class ResumableGames:
+    '''
+    Yields the games in fp that are newer than index (or latest when there is no index).
+
+    When iteration completes `index` holds the index to save for the next run.
+    If the file was rewritten since the index was made the whole file is scanned,
+    only yielding games newer than the indexed timestamp.
+    '''
+
+    def __init__(self, fp: BinaryIO, index: ResumeIndex = None, latest: datetime = datetime.min):
+        self.reader = ResumableReader(fp, index)
+        self.latest = index.ts if index is not None else latest
+        self.index = index
+
+    def __iter__(self) -> Iterable[parsers.Game]:
+        ts = self.latest
+        for game in parsers.GameIterator(unseen_rows(self.reader, self.latest)):
+            if game.date > ts:
+                ts = game.date
+            yield game
+        self.index = self.reader.make_index(ts)
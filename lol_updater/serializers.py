@@ -0,0 +1,146 @@
+import json
+from json.encoder import encode_basestring_ascii
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, TextIO
+from datetime import datetime
+
+from . import parsers
+
+# the text json.dumps produces for the scalars we write
+TRUE = 'true'
+FALSE = 'false'
+NULL = 'null'
+
+PLAYER_GAME_FORMAT = (
+    '{"player": {"playerid": %s, "name": %s}, "position": %s, '
+    + ', '.join(f'"{attr}": %d' for attr in parsers.PlayerGame.INT_ATTRS)
+    + '}'
+)
+TEAM_GAME_FORMAT = (
+    '{"team": {"teamid": %s, "name": %s}, "side": %s, "win": %s, '
+    + ', '.join(f'"{attr}": %d' for attr in parsers.TeamGame.INT_ATTRS)
+    + ', '
+    + ', '.join(f'"{attr}": %s' for attr in parsers.TeamGame.BOOL_ATTRS)
+    + '}'
+)
+GAME_FORMAT = (
+    '{"gameid": %s, "date": "%s", "duration": %s, "game": %s, "league": %s, "split": %s, '
+    '"playoffs": %s, "status": %s, "playergames": [%s], "teamgames": [%s]}'
+)
+
+player_stats = attrgetter(*parsers.PlayerGame.INT_ATTRS)
+team_stats = attrgetter(*parsers.TeamGame.INT_ATTRS)
+team_flags = attrgetter(*parsers.TeamGame.BOOL_ATTRS)
+
+
+def encode_value(value: Any) -> str:
+    if value is None:
+        return NULL
+    elif value is True:
+        return TRUE
+    elif value is False:
+        return FALSE
+    elif isinstance(value, str):
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
+
+
+def encode_player_game(item: parsers.PlayerGame) -> str:
+    return PLAYER_GAME_FORMAT % (
+        encode_value(item.player.playerid),
+        encode_value(item.player.name),
+        encode_value(item.position),
+        *player_stats(item)
+    )
+
+
+def encode_team_game(item: parsers.TeamGame) -> str:
+    return TEAM_GAME_FORMAT % (
+        encode_value(item.team.teamid),
+        encode_value(item.team.name),
+        encode_value(item.side),
+        TRUE if item.win else FALSE,
+        *team_stats(item),
+        *[TRUE if value else FALSE for value in team_flags(item)]
+    )
+
+
+def encode_game(game: parsers.Game) -> str:
+    '''
+    The same text as json.dumps(game.as_dict()), without building the intermediate dicts
+    '''
+    return GAME_FORMAT % (
+        encode_value(game.gameid),
+        # isoformat gives the INPUT_DT_FORMAT layout for our naive datetimes, in a fraction of the time
+        game.date.isoformat(timespec='seconds'),
+        encode_value(game.duration),
+        encode_value(game.game),
+        encode_value(game.league),
+        encode_value(game.split),
+        encode_value(game.playoffs),
+        encode_value(game.status),
+        ', '.join([encode_player_game(item) for item in game.playergames]),
+        ', '.join([encode_team_game(item) for item in game.teamgames])
+    )
+
+
+def parse_input_dt(value: str) -> datetime:
+    if len(value) == 19 and value[10] == 'T':
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, parsers.INPUT_DT_FORMAT)
+
+
+def decode_game(data: Dict) -> parsers.Game:
+    '''
+    Builds a game from the output of Game.as_dict, like Game.from_dict but without re-parsing
+    values that json already gives us with the right type
+    '''
+    game = parsers.Game(
+        data['gameid'],
+        parse_input_dt(data['date']),
+        data['duration'],
+        data['game'],
+        data['league'],
+        data['split'],
+        data['playoffs'],
+        data['status']
+    )
+    for item in data['playergames']:
+        player = item['player']
+        game.playergames.append(parsers.PlayerGame(
+            parsers.Player(player['playerid'], player['name']),
+            item['position'],
+            *[item[attr] for attr in parsers.PlayerGame.INT_ATTRS]
+        ))
+    for item in data['teamgames']:
+        team = item['team']
+        teamgame = parsers.TeamGame(
+            parsers.Team(team['teamid'], team['name']),
+            item['side'],
+            item['win'],
+            *[item[attr] for attr in parsers.TeamGame.INT_ATTRS],
+            *[item[attr] for attr in parsers.TeamGame.BOOL_ATTRS]
+        )
+        game.teamgames.append(teamgame)
+    return game
+
+
+def write_games(games: Iterable[parsers.Game], output: TextIO) -> int:
+    '''
+    Writes games to output as json lines and returns the number written
+    '''
+    count = 0
+    for game in games:
+        output.write(encode_game(game))
+        output.write('\n')
+        count += 1
+    return count
+
+
+def read_games(input: Iterable[str]) -> Iterator[parsers.Game]:
+    '''
+    Reads games from the json lines written by write_games
+    '''
+    for line in input:
+        if line.strip():
+            yield decode_game(json.loads(line))
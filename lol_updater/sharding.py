@@ -0,0 +1,199 @@
+import re
+import zlib
+import queue
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+from pathlib import Path
+
+from . import compression
+from . import parsers
+from . import serializers
+
+# batches waiting for one shard's writer
+QUEUE_SIZE = 16
+# games handed to a shard's writer at a time
+BATCH_SIZE = 256
+
+DONE = object()
+# file name of the shard of games without a key, e.g. without a league
+UNKNOWN_SHARD = 'unknown'
+
+
+def by_league(game: parsers.Game) -> Optional[str]:
+    return game.league
+
+
+def by_gameid(shards: int) -> Callable[[parsers.Game], int]:
+    '''
+    Shard key that spreads games over shards buckets by a stable hash of their gameid
+    '''
+    def key(game: parsers.Game) -> int:
+        return zlib.crc32(game.gameid.encode()) % shards
+    return key
+
+
+def shard_filename(key: Hashable) -> str:
+    '''
+    A file name for key that stays inside its directory. Keys that are not plain names
+    get a hash of the key appended so that two keys never share a file
+    '''
+    raw = '' if key is None else str(key)
+    name = re.sub(r'[^\w.-]', '_', raw).lstrip('.') or UNKNOWN_SHARD
+    if name != raw:
+        name = f'{name}-{zlib.crc32(raw.encode()):08x}'
+    return name
+
+
+class JsonLinesSink:
+    '''
+    Writes a shard's games to a json lines file, compressed if its suffix says so
+    '''
+
+    def __init__(self, path, level: int = None):
+        self.output = compression.open_output(path, level=level)
+
+    def write(self, game: parsers.Game):
+        self.output.write(serializers.encode_game(game))
+        self.output.write('\n')
+
+    def close(self):
+        self.output.close()
+
+
+class LoaderSink:
+    '''
+    Writes a shard's games through a database.Loader, each shard with its own connection.
+    The loader is used from the shard's writer thread, so sqlite connections must be opened
+    with check_same_thread=False
+    '''
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def write(self, game: parsers.Game):
+        self.loader.add(game)
+
+    def close(self):
+        self.loader.load([])
+
+
+class Shard:
+    '''
+    A sink with its own queue and writer thread, which writes games in the order they were routed
+    '''
+
+    def __init__(self, key: Hashable, sink, maxsize: int):
+        self.key = key
+        self.sink = sink
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.buffer: List[parsers.Game] = []
+        self.count = 0
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self.run, name=f'shard-{key}', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            batch = self.queue.get()
+            if batch is DONE:
+                break
+            if self.error is not None:
+                # keep draining so the router is never blocked on a failed shard
+                continue
+            try:
+                for game in batch:
+                    self.sink.write(game)
+                self.count += len(batch)
+            except BaseException as error:
+                self.error = error
+        try:
+            self.sink.close()
+        except BaseException as error:
+            if self.error is None:
+                self.error = error
+
+
+class ShardedWriter:
+    '''
+    Routes games to one shard per key (league by default, see by_gameid for a fixed number of shards).
+
+    make_sink(key) is called for the first game of each key and returns an object with write(game)
+    and close() methods, e.g. JsonLinesSink or LoaderSink. Each shard buffers batch_size games and
+    writes them on its own thread, so slow sinks are written to in parallel while the games of one
+    shard keep their order. Sinks doing i/o (files, database connections) release the GIL while they wait.
+    '''
+
+    def __init__(self, make_sink: Callable[[Hashable], object], key: Callable[[parsers.Game], Hashable] = by_league,
+                 maxsize: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE):
+        self.make_sink = make_sink
+        self.key = key
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.shards: Dict[Hashable, Shard] = {}
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, game: parsers.Game):
+        key = self.key(game)
+        shard = self.shards.get(key)
+        if shard is None:
+            shard = self.shards[key] = Shard(key, self.make_sink(key), self.maxsize)
+        shard.buffer.append(game)
+        if len(shard.buffer) >= self.batch_size:
+            self.send(shard)
+
+    def send(self, shard: Shard):
+        if shard.error is not None:
+            raise shard.error
+        shard.queue.put(shard.buffer)
+        shard.buffer = []
+
+    def close(self):
+        '''
+        Writes what is buffered, waits for every shard to finish and closes the sinks.
+        Raises the first error a shard ran into. Only the first call does anything
+        '''
+        if self.closed:
+            return
+        self.closed = True
+        for shard in self.shards.values():
+            if shard.buffer and shard.error is None:
+                shard.queue.put(shard.buffer)
+                shard.buffer = []
+            shard.queue.put(DONE)
+        for shard in self.shards.values():
+            shard.thread.join()
+        for shard in self.shards.values():
+            if shard.error is not None:
+                raise shard.error
+
+    def counts(self) -> Dict[Hashable, int]:
+        return {key: shard.count for key, shard in self.shards.items()}
+
+    def run(self, games: Iterable[parsers.Game]) -> Dict[Hashable, int]:
+        '''
+        Writes games and returns the number written to each shard
+        '''
+        try:
+            for game in games:
+                self.write(game)
+        finally:
+            self.close()
+        return self.counts()
+
+
+def write_sharded(games: Iterable[parsers.Game], directory, suffix: str = '.jsonl',
+                  key: Callable[[parsers.Game], Hashable] = by_league, **kwargs) -> Dict[Hashable, int]:
+    '''
+    Writes games to one json lines file per shard key in directory, e.g. LCK.jsonl (see shard_filename)
+    '''
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    return ShardedWriter(
+        lambda shard: JsonLinesSink(directory / f'{shard_filename(shard)}{suffix}'), key, **kwargs
+    ).run(games)
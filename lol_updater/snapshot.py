@@ -0,0 +1,227 @@
+import mmap
+import struct
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional
+from datetime import datetime, timedelta
+
+from . import parsers
+from .columnar import StringTable, EPOCH, ONE_SECOND, pack_flags
+
+MAGIC = b'LOLS'
+VERSION = 1
+# string code for None
+NONE = 0xFFFFFFFF
+
+# magic, version, counts of games, player games, team games and strings,
+# then the offsets of the string table, the three record tables and the two indexes
+HEADER = struct.Struct('<4sH2xIIIIQQQQQQ')
+# gameid, date (seconds since the epoch), duration, game, league, split, playoffs, status,
+# index of the first player game and team game, number of player games and team games
+GAME = struct.Struct('<IqiiIIBIIIHH')
+# playerid, name, position then PlayerGame.INT_ATTRS
+PLAYER_GAME = struct.Struct('<III' + 'i' * len(parsers.PlayerGame.INT_ATTRS))
+# teamid, name, side, win, TeamGame.INT_ATTRS then TeamGame.BOOL_ATTRS packed into a byte
+TEAM_GAME = struct.Struct('<IIIB' + 'i' * len(parsers.TeamGame.INT_ATTRS) + 'B')
+UINT = struct.Struct('<I')
+DATE = struct.Struct('<q')
+
+
+def write_snapshot(games: Iterable[parsers.Game], path) -> int:
+    '''
+    Writes games to path in the snapshot format and returns the number of games written
+    '''
+    strings = StringTable()
+
+    def encode(value: str) -> int:
+        return NONE if value is None else strings.encode(value)
+
+    game_records = bytearray()
+    player_records = bytearray()
+    team_records = bytearray()
+    gameids = []
+    dates = []
+    nplayers = nteams = 0
+    for game in games:
+        date = (game.date - EPOCH) // ONE_SECOND
+        game_records += GAME.pack(
+            encode(game.gameid), date, game.duration, game.game,
+            encode(game.league), encode(game.split), 1 if game.playoffs else 0, encode(game.status),
+            nplayers, nteams, len(game.playergames), len(game.teamgames)
+        )
+        for playergame in game.playergames:
+            player_records += PLAYER_GAME.pack(
+                encode(playergame.player.playerid),
+                encode(playergame.player.name),
+                encode(playergame.position),
+                *[getattr(playergame, attr) for attr in parsers.PlayerGame.INT_ATTRS]
+            )
+        for teamgame in game.teamgames:
+            team_records += TEAM_GAME.pack(
+                encode(teamgame.team.teamid),
+                encode(teamgame.team.name),
+                encode(teamgame.side),
+                1 if teamgame.win else 0,
+                *[getattr(teamgame, attr) for attr in parsers.TeamGame.INT_ATTRS],
+                pack_flags(teamgame, parsers.TeamGame.BOOL_ATTRS)
+            )
+        nplayers += len(game.playergames)
+        nteams += len(game.teamgames)
+        gameids.append(game.gameid)
+        dates.append(date)
+
+    blob = bytearray()
+    string_offsets = [0]
+    for value in strings.values:
+        blob += value.encode('utf-8')
+        string_offsets.append(len(blob))
+    string_table = struct.pack(f'<{len(string_offsets)}I', *string_offsets) + blob
+    records = range(len(gameids))
+    gameid_index = struct.pack(f'<{len(gameids)}I', *sorted(records, key=gameids.__getitem__))
+    date_index = struct.pack(f'<{len(dates)}I', *sorted(records, key=dates.__getitem__))
+
+    sections = [string_table, game_records, player_records, team_records, gameid_index, date_index]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    with open(path, 'wb') as foutput:
+        foutput.write(HEADER.pack(
+            MAGIC, VERSION, len(gameids), nplayers, nteams, len(strings), *offsets
+        ))
+        for section in sections:
+            foutput.write(section)
+    return len(gameids)
+
+
+class Snapshot:
+    '''
+    Read only view of a snapshot file.
+
+    The file is memory mapped and nothing is decoded up front: games are rebuilt from their
+    fixed width records when asked for, by position, by gameid (binary search of the gameid index)
+    or by date range (binary search of the date index).
+    '''
+
+    def __init__(self, path):
+        with open(path, 'rb') as finput:
+            self.mmap = mmap.mmap(finput.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self.mmap)
+        (
+            magic, version, self.ngames, self.nplayergames, self.nteamgames, self.nstrings,
+            self.strings_offset, self.games_offset, self.players_offset, self.teams_offset,
+            self.gameid_index_offset, self.date_index_offset
+        ) = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a version {VERSION} snapshot')
+        self.blob_offset = self.strings_offset + UINT.size * (self.nstrings + 1)
+
+    def close(self):
+        self.buffer.release()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.ngames
+
+    def string(self, code: int) -> Optional[str]:
+        if code == NONE:
+            return None
+        start, end = struct.unpack_from('<II', self.buffer, self.strings_offset + UINT.size * code)
+        return str(self.buffer[self.blob_offset + start:self.blob_offset + end], 'utf-8')
+
+    def gameid(self, i: int) -> str:
+        return self.string(UINT.unpack_from(self.buffer, self.games_offset + GAME.size * i)[0])
+
+    def date(self, i: int) -> int:
+        return DATE.unpack_from(self.buffer, self.games_offset + GAME.size * i + UINT.size)[0]
+
+    def game(self, i: int) -> parsers.Game:
+        '''
+        Decodes the i'th game in the file
+        '''
+        (
+            gameid, date, duration, number, league, split, playoffs, status,
+            first_player, first_team, nplayers, nteams
+        ) = GAME.unpack_from(self.buffer, self.games_offset + GAME.size * i)
+        string = self.string
+        game = parsers.Game(
+            string(gameid),
+            EPOCH + timedelta(seconds=date),
+            duration,
+            number,
+            string(league),
+            string(split),
+            bool(playoffs),
+            string(status)
+        )
+        for j in range(first_player, first_player + nplayers):
+            playerid, name, position, *stats = PLAYER_GAME.unpack_from(
+                self.buffer, self.players_offset + PLAYER_GAME.size * j)
+            playergame = parsers.PlayerGame(parsers.Player(string(playerid), string(name)), string(position))
+            for attr, value in zip(parsers.PlayerGame.INT_ATTRS, stats):
+                setattr(playergame, attr, value)
+            game.playergames.append(playergame)
+        for j in range(first_team, first_team + nteams):
+            teamid, name, side, win, *stats, flags = TEAM_GAME.unpack_from(
+                self.buffer, self.teams_offset + TEAM_GAME.size * j)
+            teamgame = parsers.TeamGame(parsers.Team(string(teamid), string(name)), string(side), win=bool(win))
+            for attr, value in zip(parsers.TeamGame.INT_ATTRS, stats):
+                setattr(teamgame, attr, value)
+            for bit, attr in enumerate(parsers.TeamGame.BOOL_ATTRS):
+                setattr(teamgame, attr, bool(flags >> bit & 1))
+            game.teamgames.append(teamgame)
+        return game
+
+    def __iter__(self) -> Iterator[parsers.Game]:
+        for i in range(self.ngames):
+            yield self.game(i)
+
+    def index_entry(self, offset: int, position: int) -> int:
+        return UINT.unpack_from(self.buffer, offset + UINT.size * position)[0]
+
+    def get(self, gameid: str) -> Optional[parsers.Game]:
+        lo, hi = 0, self.ngames
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = self.index_entry(self.gameid_index_offset, mid)
+            value = self.gameid(i)
+            if value == gameid:
+                return self.game(i)
+            elif value < gameid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def between(self, start: datetime = None, end: datetime = None) -> Iterator[parsers.Game]:
+        '''
+        Games played from start up to (but not including) end, in date order
+        '''
+        dates = DateIndex(self)
+        lo = 0 if start is None else bisect_left(dates, (start - EPOCH) // ONE_SECOND)
+        hi = self.ngames if end is None else bisect_left(dates, (end - EPOCH) // ONE_SECOND)
+        for position in range(lo, hi):
+            yield self.game(self.index_entry(self.date_index_offset, position))
+
+
+class DateIndex:
+    '''
+    Sequence of game dates in date index order, so that bisect can search the index in place
+    '''
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self.snapshot.ngames
+
+    def __getitem__(self, position: int) -> int:
+        snapshot = self.snapshot
+        return snapshot.date(snapshot.index_entry(snapshot.date_index_offset, position))
@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import threading
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    '''
+    Serves files without logging every request
+    '''
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_directory(directory, handler=QuietHandler):
+    '''
+    Serves the files in directory over http on a free local port for the duration of the block,
+    for the tests and benchmarks of the downloaders. Yields the base url
+    '''
+    server = ThreadingHTTPServer(
+        ('127.0.0.1', 0),
+        partial(handler, directory=str(directory))
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
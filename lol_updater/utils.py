@@ -0,0 +1,24 @@
+import os
+import json
+from pathlib import Path
+
+
+def atomic_write_json(path, data, **kwargs):
+    '''
+    Writes data as json to path through a temporary file moved over it once it is on disk,
+    so a crash leaves either the old or the new file. kwargs are passed on to json.dump
+    '''
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as foutput:
+        json.dump(data, foutput, **kwargs)
+        foutput.flush()
+        os.fsync(foutput.fileno())
+    os.replace(tmp_path, path)
+    if os.name == 'posix':
+        # make the rename itself durable
+        fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -11,6 +11,10 @@ setup(
     include_package_data=True,
     install_requires=[
     ],
+    extras_require={
+        'numpy': ['numpy'],
+        'zstd': ['zstandard'],
+    },
 
     classifiers=[
         'Development Status :: 1 - Planning',
@@ -0,0 +1,89 @@
+"""
+This file contains code for testing the incremental per player and per team aggregates
+
+Running:
+- `python3 -m tests.test_aggregates`
+
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import datetime
+
+from lol_updater import aggregates
+from lol_updater import iterfactory
+from lol_updater import parsers
+
+from . import utils
+
+
+class TestAggregates(unittest.TestCase):
+
+    def setUp(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            self.games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+
+    def test_player_totals(self):
+        index = aggregates.AggregateIndex()
+        self.assertEqual(index.update(self.games), len(self.games))
+        for game in self.games:
+            for playergame in game.playergames:
+                aggregate = index.player(playergame.player.playerid, game.league, game.split)
+                expected = [
+                    p for g in self.games if (g.league, g.split) == (game.league, game.split)
+                    for p in g.playergames if p.player.playerid == playergame.player.playerid
+                ]
+                self.assertEqual(aggregate.games, len(expected))
+                for attr in parsers.PlayerGame.INT_ATTRS:
+                    self.assertEqual(aggregate.totals[attr], sum(getattr(p, attr) for p in expected))
+                self.assertAlmostEqual(aggregate.average('kills'), sum(p.kills for p in expected) / len(expected))
+
+    def test_team_rates(self):
+        index = aggregates.AggregateIndex()
+        index.update(self.games)
+        game = self.games[0]
+        teamgame = game.teamgames[0]
+        expected = [
+            t for g in self.games if (g.league, g.split) == (game.league, game.split)
+            for t in g.teamgames if t.team.teamid == teamgame.team.teamid
+        ]
+        aggregate = index.team(teamgame.team.teamid, game.league, game.split)
+        self.assertEqual(aggregate.rate('win'), sum(t.win for t in expected) / len(expected))
+        self.assertEqual(aggregate.rate('firsttower'), sum(t.firsttower for t in expected) / len(expected))
+        self.assertEqual(aggregate.totals['dragons'], sum(t.dragons for t in expected))
+        leaders = index.team_leaders('win', game.league, game.split, count=1)
+        self.assertEqual(leaders[0].rate('win'), max(
+            t.rate('win') for t in index.teams[(game.league, game.split)].values()))
+
+    def test_no_double_counting(self):
+        index = aggregates.AggregateIndex()
+        self.assertEqual(len(list(index.observe(self.games))), len(self.games))
+        self.assertEqual(index.update(self.games), 0)
+        game = self.games[0]
+        playerid = game.playergames[0].player.playerid
+        self.assertEqual(index.player(playerid, game.league, game.split).games, sum(
+            1 for g in self.games if (g.league, g.split) == (game.league, game.split)
+            for p in g.playergames if p.player.playerid == playerid
+        ))
+
+    def test_persisted(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, 'aggregates.json')
+            index = aggregates.AggregateIndex(path)
+            index.update(self.games[:2])
+            index.save()
+            index = aggregates.AggregateIndex(path)
+            index.update(self.games)
+            expected = aggregates.AggregateIndex()
+            expected.update(self.games)
+            self.assertEqual(index.players, expected.players)
+            self.assertEqual(index.teams, expected.teams)
+            self.assertEqual(index.gameids, expected.gameids)
+        game = self.games[0]
+        leaders = index.player_leaders('kills', game.league, game.split, count=3)
+        self.assertEqual(len(leaders), 3)
+        self.assertGreaterEqual(leaders[0].totals['kills'], leaders[-1].totals['kills'])
+
+
+if __name__ == '__main__':
+    unittest.main()
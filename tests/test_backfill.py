@@ -0,0 +1,62 @@
+"""This file contains code for testing concurrent multi season backfills
+
+Running:
+- `python3 -m tests.test_backfill`
+
+"""
+import time
+import threading
+import unittest
+from datetime import datetime
+
+from lol_updater import backfill
+from lol_updater import iterfactory
+from lol_updater import locator
+
+from . import utils
+
+FILENAMES = ('games.csv', 'game_rows.csv', 'games.csv')
+
+
+class TestBackfill(unittest.TestCase):
+
+    def make_links(self, base_url):
+        return [
+            locator.Link(filename, f'{base_url}/{filename}', 2020 + i, 0, datetime(2022, 6, 1))
+            for i, filename in enumerate(FILENAMES)
+        ]
+
+    def test_backfill(self):
+        expected = []
+        for filename in FILENAMES:
+            with open(utils.get_games_file_csv(filename), 'r') as finput:
+                expected.append(list(iterfactory.csv_game_iterator(datetime.min, finput)))
+        with utils.serve_directory() as base_url:
+            links = self.make_links(base_url)
+            results = backfill.Backfill(links, workers=3).run()
+        self.assertEqual([link for link, _ in results], links)
+        self.assertEqual([games for _, games in results], expected)
+
+    def test_per_host_limit(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def handler(link, games):
+            with lock:
+                active.append(link)
+                peak.append(len(active))
+            time.sleep(0.05)
+            count = sum(1 for _ in games)
+            with lock:
+                active.remove(link)
+            return count
+
+        with utils.serve_directory() as base_url:
+            results = backfill.Backfill(self.make_links(base_url), handler=handler, workers=3, per_host=1).run()
+        self.assertEqual(max(peak), 1)
+        self.assertEqual([count for _, count in results], [4, 10, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
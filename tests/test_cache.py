@@ -0,0 +1,120 @@
+"""This file contains code for testing the local match data file cache
+
+Running:
+- `python3 -m tests.test_cache`
+
+"""
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+from lol_updater import cache
+from lol_updater import locator
+from lol_updater import testing
+
+from . import utils
+
+ETAG = '"games-v1"'
+
+
+class ConditionalHandler(testing.QuietHandler):
+    '''
+    Adds ETag revalidation and byte ranges to the fixture server.
+    Set truncate to cut the next full response short
+    '''
+    truncate = 0
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        data = Path(self.directory, self.path.lstrip('/')).read_bytes()
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', ETAG) == ETAG:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+        else:
+            self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        body = data[start:]
+        if ConditionalHandler.truncate:
+            body = body[:ConditionalHandler.truncate]
+            ConditionalHandler.truncate = 0
+            self.close_connection = True
+        self.wfile.write(body)
+
+
+class TestLinkCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        ConditionalHandler.requests = []
+        self.expected = utils.get_games_file_csv('games.csv').read_bytes()
+
+    def make_link(self, base_url: str, ts: datetime) -> locator.Link:
+        return locator.Link('games', base_url + '/games.csv', 2022, 4, ts)
+
+    def test_fetch_hit_and_revalidate(self):
+        link_cache = cache.LinkCache(self.tmpdir.name)
+        with utils.serve_directory(handler=ConditionalHandler) as base_url:
+            link = self.make_link(base_url, datetime(2022, 6, 1, 10))
+            path = link_cache.fetch(link)
+            self.assertEqual(path.read_bytes(), self.expected)
+            # same timestamp: no request at all
+            link_cache.fetch(link)
+            self.assertEqual(len(ConditionalHandler.requests), 1)
+            # new timestamp but the server says nothing changed
+            newer = self.make_link(base_url, datetime(2022, 6, 2, 10))
+            newer_path = link_cache.fetch(newer)
+        self.assertEqual(ConditionalHandler.requests[-1]['If-None-Match'], ETAG)
+        self.assertEqual(newer_path.read_bytes(), self.expected)
+        self.assertFalse(path.exists())
+        stats = link_cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.revalidated), (2, 1, 1))
+        self.assertEqual(stats.bytes_downloaded, len(self.expected))
+        self.assertEqual(stats.bytes_saved, 2 * len(self.expected))
+
+    def test_fetch_resume(self):
+        link_cache = cache.LinkCache(self.tmpdir.name, chunk_size=250)
+        with utils.serve_directory(handler=ConditionalHandler) as base_url:
+            link = self.make_link(base_url, datetime(2022, 6, 1, 10))
+            ConditionalHandler.truncate = 1000
+            with self.assertRaises(requests.RequestException):
+                link_cache.fetch(link)
+            path = link_cache.fetch(link)
+        self.assertEqual(ConditionalHandler.requests[-1]['Range'], 'bytes=1000-')
+        self.assertEqual(path.read_bytes(), self.expected)
+        self.assertEqual(link_cache.stats.resumed, 1)
+        self.assertEqual(link_cache.stats.bytes_saved, 1000)
+        self.assertEqual(link_cache.stats.bytes_downloaded, len(self.expected))
+
+    def test_fetch_discards_stale_part(self):
+        link_cache = cache.LinkCache(self.tmpdir.name, chunk_size=250)
+        with utils.serve_directory(handler=ConditionalHandler) as base_url:
+            link = self.make_link(base_url, datetime(2022, 6, 1, 10))
+            ConditionalHandler.truncate = 1000
+            with self.assertRaises(requests.RequestException):
+                link_cache.fetch(link)
+            stale = link_cache.path(link).with_name(link.filename + cache.PART_SUFFIX)
+            self.assertTrue(stale.exists())
+            # the next file of the year is a fresh download
+            path = link_cache.fetch(self.make_link(base_url, datetime(2022, 6, 2, 10)))
+        self.assertNotIn('Range', ConditionalHandler.requests[-1])
+        self.assertEqual(path.read_bytes(), self.expected)
+        self.assertFalse(stale.exists())
+        self.assertEqual(list(path.parent.glob('*' + cache.PART_SUFFIX)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+This file contains code for testing change data capture against the previous run
+
+Running:
+- `python3 -m tests.test_changes`
+
+"""
+import csv
+import io
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import datetime
+
+from lol_updater import changes
+from lol_updater import database
+from lol_updater import iterfactory
+from lol_updater import serializers
+
+from . import utils
+
+
+class FailingBackend(database.SqliteBackend):
+    '''
+    Fails to commit until fail is unset
+    '''
+    fail = True
+
+    def commit(self):
+        if self.fail:
+            raise sqlite3.OperationalError('disk I/O error')
+        super().commit()
+
+
+class TestChanges(unittest.TestCase):
+
+    def setUp(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r', newline='') as finput:
+            reader = csv.DictReader(finput)
+            self.fieldnames = reader.fieldnames
+            self.rows = list(reader)
+        self.gameids = list(dict.fromkeys(row['gameid'] for row in self.rows))
+
+    def lines(self, rows):
+        output = io.StringIO()
+        writer = csv.DictWriter(output, self.fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+        return output.getvalue().splitlines(keepends=True)
+
+    def corrected(self):
+        '''
+        The first game completed with a changed stat, the last game gone
+        '''
+        rows = []
+        for row in self.rows:
+            if row['gameid'] == self.gameids[0]:
+                row = dict(row, datacompleteness='complete', kills='99' if row['position'] == 'mid' else row['kills'])
+            if row['gameid'] != self.gameids[-1]:
+                rows.append(row)
+        return rows
+
+    def test_digest(self):
+        games = list(iterfactory.csv_game_iterator(datetime.min, self.lines(self.rows)))
+        game = serializers.decode_game(games[0].as_dict())
+        self.assertEqual(changes.digest(game), changes.digest(games[0]))
+        game.playergames[0].kills += 1
+        self.assertNotEqual(changes.digest(game), changes.digest(games[0]))
+
+    def test_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, 'digests.json')
+            iterator = iterfactory.csv_change_iterator(self.lines(self.rows), changes.DigestStore(path))
+            first = list(iterator)
+            self.assertEqual([change.kind for change in first], [changes.INSERTED] * len(self.gameids))
+            self.assertFalse(path.exists())
+            iterator.commit()
+            self.assertTrue(path.exists())
+
+            again = iterfactory.csv_change_iterator(self.lines(self.rows), changes.DigestStore(path))
+            self.assertEqual(list(again), [])
+            self.assertEqual(again.counts['unchanged'], len(self.gameids))
+
+            iterator = iterfactory.csv_change_iterator(self.lines(self.corrected()), changes.DigestStore(path))
+            result = list(iterator)
+            iterator.commit()
+            self.assertEqual(
+                [(change.kind, change.gameid) for change in result],
+                [(changes.UPDATED, self.gameids[0]), (changes.DELETED, self.gameids[-1])]
+            )
+            self.assertIsNone(result[1].game)
+            self.assertNotIn(self.gameids[-1], changes.DigestStore(path).digests)
+
+    def test_interrupted_run_is_repeated(self):
+        store = changes.DigestStore()
+        iterator = iter(iterfactory.csv_change_iterator(self.lines(self.rows), store))
+        next(iterator)
+        self.assertEqual(store.digests, {})
+
+    def test_failed_commit_is_repeated(self):
+        connection = sqlite3.connect(':memory:')
+        self.addCleanup(connection.close)
+        backend = FailingBackend(connection)
+        backend.create_tables()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, 'digests.json')
+            with self.assertRaises(sqlite3.OperationalError):
+                database.Loader(backend).apply(
+                    iterfactory.csv_change_iterator(self.lines(self.rows), changes.DigestStore(path)))
+            self.assertFalse(path.exists())
+            # the rerun reports the same changes
+            backend.fail = False
+            iterator = iterfactory.csv_change_iterator(self.lines(self.rows), changes.DigestStore(path))
+            counts = database.Loader(backend).apply(iterator)
+        self.assertEqual(iterator.counts[changes.INSERTED], len(self.gameids))
+        self.assertEqual(counts['games'], len(self.gameids))
+        self.assertEqual(connection.execute('SELECT COUNT(*) FROM games').fetchone()[0], len(self.gameids))
+
+    def test_apply(self):
+        connection = sqlite3.connect(':memory:')
+        self.addCleanup(connection.close)
+        backend = database.SqliteBackend(connection)
+        backend.create_tables()
+        store = changes.DigestStore()
+        database.Loader(backend).apply(iterfactory.csv_change_iterator(self.lines(self.rows), store))
+        counts = database.Loader(backend).apply(
+            iterfactory.csv_change_iterator(self.lines(self.corrected()), store))
+        self.assertEqual(counts['games'], 1)
+        self.assertEqual(counts['player_games'], 10)
+        count = connection.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+        self.assertEqual(count, len(self.gameids) - 1)
+        self.assertEqual(connection.execute(
+            'SELECT COUNT(*) FROM player_games WHERE gameid = ?', (self.gameids[-1],)).fetchone()[0], 0)
+        status, = connection.execute(
+            'SELECT status FROM games WHERE gameid = ?', (self.gameids[0],)).fetchone()
+        self.assertEqual(status, 'complete')
+        self.assertEqual(connection.execute(
+            "SELECT MAX(kills) FROM player_games WHERE gameid = ? AND position = 'mid'",
+            (self.gameids[0],)).fetchone()[0], 99)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""This file contains code for testing checkpointed, resumable runs over a yearly file
+
+Running:
+- `python3 -m tests.test_checkpoints`
+
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import datetime
+
+from lol_updater import checkpoints
+from lol_updater import locator
+
+from . import utils
+
+
+class TestCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.lines = utils.get_games_file_csv('games.csv').read_bytes().splitlines(keepends=True)
+        self.path = Path(self.tmpdir.name, 'games.csv')
+        self.store_path = Path(self.tmpdir.name, 'checkpoints.json')
+        self.link = locator.Link('2022 match data', 'http://localhost/2022.csv', 2022, 4, datetime(2022, 6, 1))
+        self.path.write_bytes(b''.join(self.lines))
+        with open(self.path, 'rb') as finput:
+            self.gameids = [game.gameid for game in self.games(finput, every=1000)]
+
+    def games(self, finput, every: int = 1):
+        return checkpoints.CheckpointedGames(finput, checkpoints.CheckpointStore(self.store_path), self.link, every)
+
+    def run_ids(self, every: int = 1):
+        with open(self.path, 'rb') as finput:
+            games = self.games(finput, every)
+            ids = [game.gameid for game in games]
+            games.commit()
+        return ids
+
+    def test_full_run(self):
+        self.assertEqual(len(self.gameids), 4)
+        self.assertEqual(self.run_ids(), self.gameids)
+        checkpoint = checkpoints.CheckpointStore(self.store_path).get(self.link)
+        self.assertEqual(checkpoint.offset, self.path.stat().st_size)
+        self.assertEqual(checkpoint.gameid, self.gameids[-1])
+        self.assertEqual(checkpoint.games, 4)
+        self.assertEqual(checkpoints.CheckpointStore(self.store_path).latest(self.link), checkpoint.ts)
+        self.assertEqual(self.run_ids(), [])
+
+    def test_commit_is_left_to_the_consumer(self):
+        # setUp read every game without committing
+        self.assertFalse(self.store_path.exists())
+        self.assertEqual(self.run_ids(every=1000), self.gameids)
+        self.assertEqual(checkpoints.CheckpointStore(self.store_path).get(self.link).gameid, self.gameids[-1])
+
+    def test_stopped_run_resumes(self):
+        with open(self.path, 'rb') as finput:
+            checkpointed = self.games(finput, every=1000)
+            games = iter(checkpointed)
+            next(games)
+            next(games)
+            games.close()
+            # the consumer never came back for a third game, so only the first is done
+            checkpointed.commit()
+        checkpoint = checkpoints.CheckpointStore(self.store_path).get(self.link)
+        self.assertEqual(checkpoint.gameid, self.gameids[0])
+        with open(self.path, 'rb') as finput:
+            games = self.games(finput)
+            self.assertEqual([game.gameid for game in games], self.gameids[1:])
+            self.assertTrue(games.reader.resumed)
+        self.assertEqual(checkpoints.CheckpointStore(self.store_path).get(self.link).games, 4)
+
+    def test_checkpoint_every(self):
+        with open(self.path, 'rb') as finput:
+            games = iter(self.games(finput, every=2))
+            for _ in range(4):
+                next(games)
+            # as a crash would find it: the second game is committed, the third is not
+            checkpoint = checkpoints.CheckpointStore(self.store_path).get(self.link)
+            self.assertEqual(checkpoint.gameid, self.gameids[1])
+            self.assertEqual(checkpoint.games, 2)
+            # stopping commits nothing more
+            games.close()
+        self.assertEqual(self.run_ids(), self.gameids[2:])
+
+    def test_appended_file(self):
+        # header and the first two games
+        self.path.write_bytes(b''.join(self.lines[:25]))
+        self.assertEqual(self.run_ids(), self.gameids[:2])
+        self.path.write_bytes(b''.join(self.lines))
+        with open(self.path, 'rb') as finput:
+            games = self.games(finput)
+            self.assertEqual([game.gameid for game in games], self.gameids[2:])
+            self.assertTrue(games.reader.resumed)
+
+    def test_same_date_after_offset(self):
+        # the third game is dated the same as the second, the last one before the offset
+        date = self.lines[13].split(b',')[7]
+        lines = self.lines[:25] + [
+            b','.join(line.split(b',')[:7] + [date] + line.split(b',')[8:]) for line in self.lines[25:37]
+        ] + self.lines[37:]
+        self.path.write_bytes(b''.join(lines[:25]))
+        self.assertEqual(self.run_ids(), self.gameids[:2])
+        self.path.write_bytes(b''.join(lines))
+        with open(self.path, 'rb') as finput:
+            pending = checkpoints.dry_run(finput, checkpoints.CheckpointStore(self.store_path), self.link)
+        self.assertEqual(pending.games, 2)
+        self.assertEqual(self.run_ids(), self.gameids[2:])
+
+    def test_dry_run(self):
+        self.path.write_bytes(b''.join(self.lines[:25]))
+        self.run_ids()
+        self.path.write_bytes(b''.join(self.lines))
+        before = self.store_path.read_bytes()
+        with open(self.path, 'rb') as finput:
+            pending = checkpoints.dry_run(finput, checkpoints.CheckpointStore(self.store_path), self.link)
+        self.assertTrue(pending.resumed)
+        self.assertEqual(pending.games, 2)
+        self.assertEqual(pending.offset, len(b''.join(self.lines[:25])))
+        self.assertEqual(pending.bytes, self.path.stat().st_size - pending.offset)
+        self.assertEqual(pending.as_dict()['checkpoint']['gameid'], self.gameids[1])
+        self.assertEqual(self.store_path.read_bytes(), before)
+        self.assertEqual(self.run_ids(), self.gameids[2:])
+
+
+if __name__ == '__main__':
+    unittest.main()
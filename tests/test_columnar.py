@@ -0,0 +1,63 @@
+"""This file contains code for testing the column oriented season store
+
+Running:
+- `python3 -m tests.test_columnar`
+
+"""
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from lol_updater import columnar
+from lol_updater import iterfactory
+
+from . import utils
+
+
+def load_games():
+    with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+        return list(iterfactory.csv_game_iterator(datetime.min, finput))
+
+
+class TestSeasonStore(unittest.TestCase):
+
+    def setUp(self):
+        self.games = load_games()
+        self.store = columnar.SeasonStore.from_games(self.games)
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.store), len(self.games))
+        self.assertEqual(list(self.store), self.games)
+        self.assertEqual(self.store.player_offsets[-1], sum(len(g.playergames) for g in self.games))
+
+    def expected_kda(self):
+        totals = {}
+        for game in self.games:
+            for playergame in game.playergames:
+                k, d, a = totals.get(playergame.player.playerid, (0, 0, 0))
+                totals[playergame.player.playerid] = (
+                    k + playergame.kills, d + playergame.deaths, a + playergame.assists
+                )
+        return {playerid: (k + a) / max(d, 1) for playerid, (k, d, a) in totals.items()}
+
+    def expected_rate(self, attr):
+        counts = {}
+        for game in self.games:
+            for teamgame in game.teamgames:
+                hits, total = counts.get(teamgame.team.teamid, (0, 0))
+                counts[teamgame.team.teamid] = (hits + getattr(teamgame, attr), total + 1)
+        return {teamid: hits / total for teamid, (hits, total) in counts.items()}
+
+    def test_aggregates(self):
+        self.assertEqual(self.store.player_kda(), self.expected_kda())
+        for attr in ('win', 'firstdragon', 'firsttower'):
+            self.assertEqual(self.store.team_rate(attr), self.expected_rate(attr))
+
+    def test_aggregates_without_numpy(self):
+        with mock.patch.object(columnar, 'numpy', None):
+            self.assertEqual(self.store.player_kda(), self.expected_kda())
+            self.assertEqual(self.store.team_rate('firstdragon'), self.expected_rate('firstdragon'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+This file contains code for testing compressed csv input and json lines output
+
+Running:
+- `python3 -m tests.test_compression`
+
+"""
+import gc
+import io
+import shutil
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+from datetime import datetime
+
+from lol_updater import compression
+from lol_updater import iterfactory
+from lol_updater import serializers
+
+from . import utils
+
+SUFFIXES = ['', '.gz', '.bz2', '.xz'] + (['.zst'] if compression.zstandard is not None else [])
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = Path(tmpdir.name)
+        with open(utils.get_games_file_csv('games.csv'), 'r', newline='') as finput:
+            self.text = finput.read()
+            finput.seek(0)
+            self.games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+
+    def write(self, suffix: str, **kwargs) -> Path:
+        path = self.directory / f'games.csv{suffix}'
+        with compression.open_output(path, **kwargs) as foutput:
+            foutput.write(self.text)
+        return path
+
+    def test_csv_input(self):
+        for suffix in SUFFIXES:
+            with self.subTest(suffix=suffix):
+                path = self.write(suffix)
+                with open(path, 'rb') as finput:
+                    self.assertEqual(compression.detect(finput), compression.SUFFIXES.get(suffix))
+                self.assertEqual(list(iterfactory.csv_file_game_iterator(datetime.min, path)), self.games)
+
+    def test_detected_by_content(self):
+        # the suffix says nothing, the magic bytes do
+        path = self.write('.gz')
+        renamed = shutil.move(path, self.directory / 'games.data')
+        self.assertEqual(''.join(compression.lines(renamed)), self.text)
+        with open(renamed, 'rb') as finput:
+            self.assertEqual(compression.decompressed(finput).read().decode(), self.text)
+
+    def test_level(self):
+        sizes = [self.write('.gz', level=level).stat().st_size for level in (1, 9)]
+        self.assertGreaterEqual(sizes[0], sizes[1])
+        self.assertLess(sizes[1], len(self.text))
+
+    def test_json_lines_output(self):
+        for suffix in SUFFIXES:
+            with self.subTest(suffix=suffix):
+                path = self.directory / f'games.jsonl{suffix}'
+                with compression.open_output(path) as foutput:
+                    serializers.write_games(self.games, foutput)
+                self.assertEqual(list(serializers.read_games(compression.lines(path))), self.games)
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            compression.open_output(self.directory / 'games.csv', compression='rar')
+
+    def test_plain_stream(self):
+        fp = io.BytesIO(self.text.encode())
+        self.assertEqual(compression.decompressed(fp).read().decode(), self.text)
+
+    @unittest.skipIf(compression.zstandard is None, 'zstandard is not installed')
+    def test_zstd_frames(self):
+        # one frame per half, as concatenated .zst files have
+        compressor = compression.zstandard.ZstdCompressor()
+        middle = len(self.text) // 2
+        path = self.directory / 'games.csv.zst'
+        frames = [compressor.compress(part.encode()) for part in (self.text[:middle], self.text[middle:])]
+        path.write_bytes(b''.join(frames))
+        self.assertEqual(''.join(compression.lines(path)), self.text)
+        with open(path, 'rb') as finput:
+            self.assertEqual(compression.decompressed(finput).read().decode(), self.text)
+
+    def test_open_text_closes_file(self):
+        for suffix in SUFFIXES:
+            with self.subTest(suffix=suffix):
+                path = self.write(suffix)
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always', ResourceWarning)
+                    with compression.open_text(path) as finput:
+                        self.assertEqual(finput.read(), self.text)
+                    del finput
+                    gc.collect()
+                self.assertEqual([warning for warning in caught if warning.category is ResourceWarning], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""This file contains code for testing bulk loading games into a relational database
+
+Running:
+- `python3 -m tests.test_database`
+
+"""
+import sqlite3
+import unittest
+from datetime import datetime
+
+from lol_updater import database
+from lol_updater import iterfactory
+
+from . import utils
+
+
+class TestDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.addCleanup(self.connection.close)
+        self.backend = database.SqliteBackend(self.connection)
+        self.backend.create_tables()
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            self.games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+
+    def count(self, table: str) -> int:
+        return self.connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def test_load(self):
+        counts = database.Loader(self.backend, batch_size=3).load(self.games)
+        self.assertEqual(counts['games'], 4)
+        self.assertEqual(self.count('games'), 4)
+        self.assertEqual(self.count('player_games'), 40)
+        self.assertEqual(self.count('team_games'), 8)
+        self.assertEqual(self.count('players'), len({
+            p.player.playerid for g in self.games for p in g.playergames
+        }))
+        date, playoffs = self.connection.execute(
+            'SELECT date, playoffs FROM games WHERE gameid = ?', (self.games[0].gameid,)
+        ).fetchone()
+        self.assertEqual(date, '2022-01-14 21:26:31')
+        self.assertEqual(playoffs, int(self.games[0].playoffs))
+
+    def test_reload_upserts(self):
+        loader = database.Loader(self.backend)
+        loader.load(self.games)
+        game = self.games[0]
+        teamgame = game.teamgames[0]
+        teamgame.team = type(teamgame.team)(teamgame.team.teamid, 'Renamed')
+        teamgame.dragons = 9
+        loader.load([game])
+        self.assertEqual(self.count('games'), 4)
+        self.assertEqual(self.count('team_games'), 8)
+        self.assertEqual(self.connection.execute(
+            'SELECT name FROM teams WHERE teamid = ?', (teamgame.team.teamid,)).fetchone()[0], 'Renamed')
+        self.assertEqual(self.connection.execute(
+            'SELECT dragons FROM team_games WHERE gameid = ? AND teamid = ?',
+            (game.gameid, teamgame.team.teamid)).fetchone()[0], 9)
+
+    def test_copy_buffer(self):
+        buffer = database.copy_buffer([('a\tb', None, True, False, 3, 'c\\d\ne')])
+        self.assertEqual(buffer.read(), 'a\\tb\t\\N\tt\tf\t3\tc\\\\d\\ne\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
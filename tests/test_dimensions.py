@@ -0,0 +1,66 @@
+"""This file contains code for testing the player and team dimension cache
+
+Running:
+- `python3 -m tests.test_dimensions`
+
+"""
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import database
+from lol_updater import dimensions
+from lol_updater import iterfactory
+
+from . import utils
+
+
+class TestDimensionCache(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = Path(tmpdir.name, 'dimensions.json')
+
+    def test_lru(self):
+        cache = dimensions.LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(list(cache.items), ['a', 'c'])
+
+    def test_known_and_persisted(self):
+        cache = dimensions.DimensionCache(self.path)
+        self.assertFalse(cache.known('players', 'p1', 'Faker'))
+        cache.record('players', [('p1', 'Faker')])
+        self.assertTrue(cache.known('players', 'p1', 'Faker'))
+        self.assertFalse(cache.known('players', 'p1', 'Hide on bush'))
+        cache.save()
+        reloaded = dimensions.DimensionCache(self.path)
+        self.assertEqual(reloaded.get('players', 'p1'), 'Faker')
+        self.assertEqual(cache.hit_rates()['players'], dict(hits=1, misses=1, changes=1, hit_rate=1 / 3))
+
+    def test_loader_skips_known_dimensions(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+        connection = sqlite3.connect(':memory:')
+        self.addCleanup(connection.close)
+        backend = database.SqliteBackend(connection)
+        backend.create_tables()
+        cache = dimensions.DimensionCache(self.path)
+        first = dict(database.Loader(backend, dimensions=cache).load(games))
+        cache = dimensions.DimensionCache(self.path)
+        second = database.Loader(backend, dimensions=cache).load(games)
+        self.assertGreater(first['players'], 0)
+        # every player is looked up once per batch, however many of its games are in it
+        self.assertEqual(cache.hit_rates()['players'], dict(hits=first['players'], misses=0, changes=0, hit_rate=1))
+        self.assertEqual(second['players'], 0)
+        self.assertEqual(second['teams'], 0)
+        self.assertEqual(second['games'], first['games'])
+
+
+if __name__ == '__main__':
+    unittest.main()
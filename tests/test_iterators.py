@@ -5,10 +5,15 @@ Running:
 - `python3 -m tests.test_iterators`
 
 """
+import csv
+import itertools
 import unittest
-from datetime import datetime
+from operator import attrgetter
+from datetime import datetime, timedelta
 
 from lol_updater import iterfactory
+from lol_updater import iterators
+from lol_updater import parsers
 
 from . import utils
 
@@ -38,6 +43,95 @@ class TestLIterators(unittest.TestCase):
             [game.as_dict() for game in games], 'games.json')
         print('Games saved to {}'.format(output_file))
 
+    def test_game_iterator_matches_row_by_row(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            rows = list(csv.DictReader(finput))
+        # a game without an id, which gets one made from its league, date and number
+        rows.extend(dict(row, gameid=None) for row in rows[:12])
+        expected = []
+        for row in rows:
+            game = parsers.Game.from_row(row)
+            if expected and expected[-1].gameid == game.gameid:
+                expected[-1].playergames.extend(game.playergames)
+                expected[-1].teamgames.extend(game.teamgames)
+            else:
+                expected.append(game)
+        games = list(parsers.GameIterator(rows))
+        self.assertEqual(len(games), 5)
+        self.assertEqual(games, expected)
+
+    def test_lazy_game_iterator(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            rows = list(iterators.Columns(csv.reader(finput), parsers.COLUMNS))
+        expected = list(parsers.GameIterator(rows))
+        games = list(parsers.GameIterator(rows, lazy=True))
+        self.assertTrue(all(isinstance(game, parsers.LazyGame) for game in games))
+        self.assertEqual([game.winner for game in games], [game.winner for game in expected])
+        self.assertFalse(any(game.decoded for game in games))
+        self.assertEqual([game.gameid for game in games], [game.gameid for game in expected])
+        self.assertEqual(games, expected)
+        self.assertEqual(expected, games)
+        self.assertTrue(all(game.decoded for game in games))
+        self.assertEqual([game.as_dict() for game in games], [game.as_dict() for game in expected])
+        # rows added once decoded are parsed straight away
+        games[0].add_row(rows[0])
+        self.assertEqual(len(games[0].playergames), len(expected[0].playergames) + 1)
+
+    def interleaved_rows(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            rows = list(csv.DictReader(finput))
+        expected = list(parsers.GameIterator(rows))
+        games = {}
+        for row in rows:
+            games.setdefault(row['gameid'], []).append(row)
+        # deal the rows of every game out one at a time
+        interleaved = [
+            row for group in itertools.zip_longest(*games.values()) for row in group if row is not None
+        ]
+        return interleaved, expected
+
+    def test_reordering_game_iterator(self):
+        rows, expected = self.interleaved_rows()
+        self.assertNotEqual(list(parsers.GameIterator(rows)), expected)
+        iterator = parsers.ReorderingGameIterator(rows)
+        games = list(iterator)
+        key = attrgetter('gameid')
+        self.assertEqual(sorted(games, key=key), sorted(expected, key=key))
+        self.assertEqual(iterator.evicted, 0)
+        self.assertEqual(len(iterator.buffer), 0)
+
+    def test_reordering_game_iterator_evicts(self):
+        rows, expected = self.interleaved_rows()
+        iterator = parsers.ReorderingGameIterator(rows, window=1)
+        games = list(iterator)
+        self.assertGreater(iterator.evicted, 0)
+        self.assertGreater(len(games), len(expected))
+        self.assertEqual(
+            sum(len(game.playergames) + len(game.teamgames) for game in games),
+            sum(len(game.playergames) + len(game.teamgames) for game in expected)
+        )
+        iterator = parsers.ReorderingGameIterator(rows, horizon=timedelta(0))
+        list(iterator)
+        self.assertGreater(iterator.evicted, 0)
+
+    def test_columns(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            lines = finput.readlines()
+        expected = [
+            {column: row[column] for column in parsers.COLUMNS} for row in csv.DictReader(lines)
+        ]
+        rows = list(iterators.Columns(csv.reader(lines), parsers.COLUMNS))
+        self.assertEqual(rows, expected)
+
+    def test_columns_blank_and_short_rows(self):
+        lines = ['a,b,c', '', '1,2,3', '4']
+        rows = list(iterators.Columns(csv.reader(lines), ('c', 'a', 'missing')))
+        self.assertEqual(rows, [dict(c='3', a='1'), dict(c=None, a='4')])
+
+    def test_columns_none_in_header(self):
+        rows = list(iterators.Columns(csv.reader(['a,b', '1,2', '', '3,4']), ['zzz']))
+        self.assertEqual(rows, [{}, {}])
+
 
 if __name__ == '__main__':
     unittest.main()
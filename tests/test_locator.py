@@ -26,6 +26,14 @@ class TestLocator(unittest.TestCase):
             self.assertEqual(link.name, d['name'])
             self.assertEqual(link.ts, locator.parse_dt(d['updatedAt']))
 
+    def test_parse_dt(self):
+        self.assertEqual(
+            locator.parse_dt('2022-06-04T03:34:53.000Z'),
+            datetime(2022, 6, 4, 3, 34, 53)
+        )
+        with self.assertRaises(ValueError):
+            locator.parse_dt('2022-06-04 03:34:53')
+
     def test_latest_link(self):
         links = sorted(self.load_test_links(), reverse=True)
         # descending order
@@ -50,6 +58,24 @@ class TestLocator(unittest.TestCase):
         ))
         self.assertGreater(ngames, 0)
 
+    def test_stream_games(self):
+        current_latest = datetime(2022, 1, 14, 23, 5, 34)
+        with utils.serve_directory() as base_url:
+            url = base_url + '/games.csv'
+            lines = locator.download_games(url)
+            streamed = list(locator.download_games(url, stream=True))
+            games = list(iterfactory.csv_game_iterator(
+                current_latest,
+                locator.stream_games(url, chunk_size=256)
+            ))
+        self.assertEqual([line.rstrip('\r\n') for line in streamed], lines)
+        self.assertEqual(len(games), 3)
+
+    def test_stream_games_missing(self):
+        with utils.serve_directory() as base_url:
+            lines = list(locator.stream_games(base_url + '/missing.csv'))
+        self.assertEqual(lines, [])
+
     # def test_link_downloader(self):
     #     links = locator.get_links(API_KEY)
     #     self.assertGreater(len(links), 0)
@@ -0,0 +1,84 @@
+"""
+This file contains code for testing the metrics registry and profiling hooks
+
+Running:
+- `python3 -m tests.test_metrics`
+
+"""
+import os
+import json
+import tempfile
+import unittest
+from datetime import datetime
+
+from lol_updater import iterfactory
+from lol_updater import locator
+from lol_updater import metrics
+
+from . import utils
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.registry.reset()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.registry.reset()
+
+    def run_games(self):
+        latest = datetime(2022, 1, 14, 23, 5, 34)
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            return list(iterfactory.csv_game_iterator(latest, finput))
+
+    def test_disabled(self):
+        games = self.run_games()
+        self.assertEqual(len(games), 3)
+        self.assertEqual(metrics.registry.as_dict(), dict(counters={}, timers={}))
+
+    def test_enabled(self):
+        metrics.enable()
+        games = self.run_games()
+        data = metrics.registry.as_dict()
+        counters = data['counters']
+        self.assertEqual(counters['games_emitted'], len(games))
+        rows = sum(len(game.playergames) + len(game.teamgames) for game in games)
+        self.assertEqual(counters['rows_read'] - counters['rows_skipped'], rows)
+        self.assertGreater(counters['rows_skipped'], 0)
+        self.assertGreater(data['timers']['game_from_row'], 0)
+        self.assertGreater(data['timers']['game_add_row'], 0)
+        self.assertEqual(json.loads(metrics.registry.to_json()), data)
+
+    def test_prometheus(self):
+        metrics.registry.incr('rows_read', 5)
+        metrics.registry.add_time('game_from_row', 0.5)
+        text = metrics.registry.to_prometheus()
+        self.assertIn('# TYPE lol_updater_rows_read_total counter\n', text)
+        self.assertIn('lol_updater_rows_read_total 5\n', text)
+        self.assertIn('lol_updater_game_from_row_seconds_total 0.5\n', text)
+
+    def test_bytes_downloaded(self):
+        metrics.enable()
+        with utils.serve_directory() as url:
+            lines = list(locator.stream_games(f'{url}/games.csv'))
+        self.assertGreater(len(lines), 0)
+        size = os.path.getsize(utils.get_games_file_csv('games.csv'))
+        self.assertEqual(metrics.registry.as_dict()['counters']['bytes_downloaded'], size)
+
+    def test_profiled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with metrics.profiled(directory, memory=True):
+                self.run_games()
+            self.assertTrue(os.path.exists(os.path.join(directory, 'profile.pstats')))
+            self.assertTrue(os.path.exists(os.path.join(directory, 'tracemalloc.txt')))
+
+    def test_profiled_off(self):
+        os.environ.pop(metrics.PROFILE_ENV, None)
+        with metrics.profiled():
+            games = self.run_games()
+        self.assertEqual(len(games), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
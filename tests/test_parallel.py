@@ -0,0 +1,57 @@
+"""This file contains code for testing parallel parsing of match data files
+
+Running:
+- `python3 -m tests.test_parallel`
+
+"""
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterfactory
+from lol_updater import parallel
+
+from . import utils
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.path = utils.get_games_file_csv('games.csv')
+
+    def test_split_ranges(self):
+        data = self.path.read_bytes()
+        ranges = parallel.split_ranges(self.path, 8)
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            # each range starts with the first row of a game
+            previous = data[:start].splitlines()[-1]
+            first = data[start:].splitlines()[0]
+            self.assertNotEqual(previous.split(b',')[0], first.split(b',')[0])
+
+    def test_parallel_game_iterator(self):
+        latest = datetime(2022, 1, 14, 23, 5, 34)
+        with open(self.path, 'r') as finput:
+            expected = list(iterfactory.csv_game_iterator(latest, finput))
+        games = list(iterfactory.csv_parallel_game_iterator(latest, self.path, workers=2))
+        self.assertEqual(len(games), 3)
+        self.assertEqual(games, expected)
+
+    def test_blank_lines(self):
+        lines = self.path.read_bytes().splitlines(keepends=True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, 'games.csv')
+            # a blank line after every game
+            path.write_bytes(b''.join(line + (b'\n' if i % 12 == 0 else b'') for i, line in enumerate(lines)))
+            ranges = parallel.split_ranges(path, 8)
+            self.assertEqual(len(ranges), 4)
+            games = list(parallel.ParallelGameIterator(datetime.min, path, workers=2))
+        with open(self.path, 'r') as finput:
+            self.assertEqual(games, list(iterfactory.csv_game_iterator(datetime.min, finput)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,6 +32,16 @@ class TestGame(unittest.TestCase):
                     game_data[GAME_KEYMAP.get(key, key)]
                 )
 
+    def test_registry(self):
+        game_data = utils.get_player_game()
+        registry = parsers.Registry()
+        game = parsers.Game.from_row(game_data, registry)
+        game2 = parsers.Game.from_row(dict(game_data), registry)
+        self.assertEqual(game, parsers.Game.from_row(game_data))
+        self.assertIs(game.playergames[0].player, game2.playergames[0].player)
+        self.assertIs(game.league, game2.league)
+        self.assertEqual(len(registry.players), 1)
+
     def test_make_game_id(self):
         now = datetime.datetime.now()
         league = 'LCS'
@@ -41,6 +51,14 @@ class TestGame(unittest.TestCase):
         self.assertTrue(gameid.endswith(str(game)))
         self.assertTrue(now.strftime(parsers.GAME_ID_FORMAT) in gameid)
 
+    def test_parse_dt(self):
+        expected = datetime.datetime(2022, 1, 14, 21, 26, 31)
+        for value in ('2022-01-14T21:26:31', '2022-01-14 21:26:31', '2022-1-14 21:26:31'):
+            self.assertEqual(parsers.parse_dt(value), expected)
+            self.assertEqual(parsers.parse_dt(value), parsers.parse_dt_strptime(value))
+        for value in (None, '', '2022-01-14', '2022-01-14T21:26:31+01:00', '2022-13-14 21:26:31', 'not a date'):
+            self.assertIsNone(parsers.parse_dt(value))
+
     def test_parse_bool(self):
         for v in (1, 2, True, 'true', '1', 'yes', 'Yes', 'True'):
             self.assertTrue(parsers.parse_bool(v))
@@ -0,0 +1,55 @@
+"""This file contains code for testing the threaded ingest pipeline
+
+Running:
+- `python3 -m tests.test_pipeline`
+
+"""
+import unittest
+from datetime import datetime
+
+from lol_updater import iterfactory
+from lol_updater import pipeline
+
+from . import utils
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.latest = datetime(2022, 1, 14, 23, 5, 34)
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            self.lines = finput.readlines()
+        self.expected = list(iterfactory.csv_game_iterator(self.latest, self.lines))
+
+    def test_game_pipeline(self):
+        games = pipeline.game_pipeline(self.latest, self.lines, batch_size=5, maxsize=1)
+        self.assertEqual(list(games), self.expected)
+        self.assertEqual([stats.name for stats in games.stats], ['source', 'decode', 'assemble'])
+        self.assertEqual([stats.items for stats in games.stats], [len(self.lines), 36, 3])
+
+    def test_sink(self):
+        written = []
+        games = pipeline.game_pipeline(self.latest, iter(self.lines), write=written.append)
+        self.assertEqual(games.run(), 0)
+        self.assertEqual(written, self.expected)
+
+    def test_stage_error(self):
+        def fail(items):
+            for item in items:
+                raise ValueError('bad row')
+            yield
+
+        games = pipeline.Pipeline(self.lines, [('fail', fail)])
+        with self.assertRaises(ValueError):
+            games.run()
+
+    def test_stop_early(self):
+        games = pipeline.Pipeline(range(100000), [('double', lambda items: (i * 2 for i in items))], maxsize=1)
+        for i in games:
+            if i > 10:
+                break
+        self.assertLess(games.stats[0].items, 100000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+This file contains code for testing queries over the secondary game indexes
+
+Running:
+- `python3 -m tests.test_query`
+
+"""
+import unittest
+from datetime import datetime, timedelta
+
+from lol_updater import iterfactory
+from lol_updater import query
+
+from . import utils
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            self.games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+        self.index = query.GameIndex(self.games)
+
+    def scan(self, league=None, split=None, playoffs=None, player=None, team=None, start=None, end=None):
+        return sorted((
+            game for game in self.games
+            if (league is None or game.league == league)
+            and (split is None or game.split == split)
+            and (playoffs is None or game.playoffs == playoffs)
+            and (player is None or any(p.player.playerid == player for p in game.playergames))
+            and (team is None or any(t.team.teamid == team for t in game.teamgames))
+            and (start is None or game.date >= start)
+            and (end is None or game.date < end)
+        ), key=lambda game: game.date)
+
+    def test_matches_scan(self):
+        game = self.games[1]
+        team = game.teamgames[0].team.teamid
+        player = game.playergames[0].player.playerid
+        cases = [
+            dict(),
+            dict(league=game.league),
+            dict(league=game.league, split=game.split, playoffs=game.playoffs, team=team),
+            dict(player=player),
+            dict(team=team, start=game.date),
+            dict(team=team, end=game.date),
+            dict(start=game.date, end=game.date + timedelta(seconds=1)),
+            dict(league='nowhere'),
+            dict(league=game.league, start=game.date + timedelta(days=3650)),
+        ]
+        for filters in cases:
+            with self.subTest(**filters):
+                results = self.index.query(**filters)
+                self.assertEqual(list(results), self.scan(**filters))
+                self.assertEqual(len(results), len(self.scan(**filters)))
+
+    def test_replace(self):
+        game = self.games[0]
+        moved = type(game)(game.gameid, game.date, game.duration, game.game, 'OTHER', game.split,
+                           game.playoffs, game.status)
+        self.index.add(moved)
+        self.assertEqual(len(self.index), len(self.games))
+        self.assertIs(self.index.get(game.gameid), moved)
+        self.assertEqual(list(self.index.query(league='OTHER')), [moved])
+        self.assertNotIn(moved, self.index.query(league=game.league))
+        self.assertEqual(len(self.index.query()), len(self.games))
+
+
+if __name__ == '__main__':
+    unittest.main()
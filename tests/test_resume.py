@@ -0,0 +1,77 @@
+"""This file contains code for testing resuming reads from a byte offset index
+
+Running:
+- `python3 -m tests.test_resume`
+
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from lol_updater import resume
+
+from . import utils
+
+
+class TestResume(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.lines = utils.get_games_file_csv('games.csv').read_bytes().splitlines(keepends=True)
+        self.path = Path(self.tmpdir.name, 'games.csv')
+        self.index_path = Path(self.tmpdir.name, 'resume.json')
+
+    def write(self, lines):
+        self.path.write_bytes(b''.join(lines))
+
+    def read(self, index=None):
+        with open(self.path, 'rb') as finput:
+            games = resume.ResumableGames(finput, index)
+            ids = [game.gameid for game in games]
+        return games, ids
+
+    def test_resume_after_append(self):
+        # header and the first two games
+        self.write(self.lines[:25])
+        games, ids = self.read()
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(games.index.offset, self.path.stat().st_size)
+        games.index.save(self.index_path)
+
+        self.write(self.lines)
+        index = resume.ResumeIndex.load(self.index_path)
+        games, new_ids = self.read(index)
+        self.assertTrue(games.reader.resumed)
+        self.assertEqual(len(new_ids), 2)
+        self.assertFalse(set(ids) & set(new_ids))
+        self.assertEqual(games.index.offset, self.path.stat().st_size)
+        self.assertGreater(games.index.ts, index.ts)
+
+    def test_rewritten_file_is_scanned(self):
+        self.write(self.lines[:25])
+        games, ids = self.read()
+        # same rows with a retroactive change in the first game
+        self.write([self.lines[0], self.lines[1].replace(b'complete', b'partial')] + self.lines[2:])
+        games, new_ids = self.read(games.index)
+        self.assertFalse(games.reader.resumed)
+        self.assertEqual(len(new_ids), 2)
+        self.assertFalse(set(ids) & set(new_ids))
+
+    def test_same_date_after_offset(self):
+        # the third game is dated the same as the second, the last one before the offset
+        date = self.lines[13].split(b',')[7]
+        lines = self.lines[:25] + [
+            b','.join(line.split(b',')[:7] + [date] + line.split(b',')[8:]) for line in self.lines[25:37]
+        ] + self.lines[37:]
+        self.write(lines[:25])
+        games, ids = self.read()
+        self.write(lines)
+        games, new_ids = self.read(games.index)
+        self.assertTrue(games.reader.resumed)
+        self.assertEqual(len(new_ids), 2)
+        self.assertFalse(set(ids) & set(new_ids))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,14 @@ Running:
 
 """
 
+import io
+import json
 import unittest
+from datetime import datetime
 
+from lol_updater import iterfactory
 from lol_updater import parsers
+from lol_updater import serializers
 
 from . import utils
 
@@ -31,6 +36,26 @@ class TestSerializers(unittest.TestCase):
         print('Team game saved to {}'.format(output_file))
 
 
+class TestJsonLines(unittest.TestCase):
+
+    def setUp(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            self.games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+        self.games.append(parsers.Game.from_row(dict(utils.get_player_game(), playername='Zoë "Z"')))
+
+    def test_encode_matches_as_dict(self):
+        for game in self.games:
+            self.assertEqual(serializers.encode_game(game), json.dumps(game.as_dict()))
+
+    def test_round_trip(self):
+        output = io.StringIO()
+        self.assertEqual(serializers.write_games(self.games, output), len(self.games))
+        output.seek(0)
+        games = list(serializers.read_games(output))
+        self.assertEqual(games, self.games)
+        self.assertEqual(games, [parsers.Game.from_dict(game.as_dict()) for game in self.games])
+
+
 if __name__ == '__main__':
     # run the actual unittests
     unittest.main()
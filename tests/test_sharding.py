@@ -0,0 +1,144 @@
+"""
+This file contains code for testing sharded output with a writer thread per shard
+
+Running:
+- `python3 -m tests.test_sharding`
+
+"""
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import datetime
+
+from lol_updater import compression
+from lol_updater import database
+from lol_updater import iterfactory
+from lol_updater import serializers
+from lol_updater import sharding
+
+from . import utils
+
+
+class ListSink:
+
+    def __init__(self):
+        self.games = []
+        self.closed = False
+
+    def write(self, game):
+        self.games.append(game)
+
+    def close(self):
+        self.closed = True
+
+
+class FailingSink(ListSink):
+
+    def write(self, game):
+        raise ValueError('sink is broken')
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+        # enough games for several batches per shard
+        self.games = [
+            type(game)(f'{game.gameid}_{i}', game.date, game.duration, game.game, f'{game.league}{i % 3}',
+                       game.split, game.playoffs, game.status)
+            for i in range(200) for game in games
+        ]
+
+    def test_by_league(self):
+        sinks = {}
+        writer = sharding.ShardedWriter(lambda key: sinks.setdefault(key, ListSink()), batch_size=7)
+        counts = writer.run(self.games)
+        leagues = {game.league for game in self.games}
+        self.assertEqual(set(sinks), leagues)
+        for league, sink in sinks.items():
+            self.assertTrue(sink.closed)
+            self.assertEqual(sink.games, [game for game in self.games if game.league == league])
+            self.assertEqual(counts[league], len(sink.games))
+
+    def test_by_gameid(self):
+        sinks = {}
+        key = sharding.by_gameid(4)
+        sharding.ShardedWriter(lambda shard: sinks.setdefault(shard, ListSink()), key, batch_size=16).run(self.games)
+        self.assertEqual(set(sinks), {0, 1, 2, 3})
+        for shard, sink in sinks.items():
+            self.assertEqual(sink.games, [game for game in self.games if key(game) == shard])
+
+    def test_error(self):
+        writer = sharding.ShardedWriter(lambda key: FailingSink(), batch_size=1, maxsize=1)
+        with self.assertRaises(ValueError):
+            writer.run(self.games)
+
+    def test_write_sharded(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            counts = sharding.write_sharded(self.games, tmpdir, suffix='.jsonl.gz')
+            self.assertEqual(sum(counts.values()), len(self.games))
+            for league, count in counts.items():
+                path = Path(tmpdir, f'{league}.jsonl.gz')
+                games = list(serializers.read_games(compression.lines(path)))
+                self.assertEqual(len(games), count)
+                self.assertEqual([game.gameid for game in games],
+                                 [game.gameid for game in self.games if game.league == league])
+
+    def test_shard_filename(self):
+        self.assertEqual(sharding.shard_filename('LCK'), 'LCK')
+        names = [sharding.shard_filename(key) for key in (None, 'LCK/CL', 'LCK_CL', '..', 3)]
+        self.assertTrue(names[0].startswith(sharding.UNKNOWN_SHARD))
+        self.assertTrue(names[1].startswith('LCK_CL-'))
+        self.assertEqual(names[2], 'LCK_CL')
+        self.assertNotIn('/', ''.join(names))
+        self.assertFalse(names[3].startswith('.'))
+        self.assertEqual(names[4], '3')
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_write_sharded_keys(self):
+        games = [
+            type(game)(game.gameid, game.date, game.duration, game.game, league, game.split, game.playoffs,
+                       game.status)
+            for game, league in zip(self.games, (None, '../LCK', 'LCK'))
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            directory = Path(tmpdir, 'leagues')
+            counts = sharding.write_sharded(games, directory)
+            self.assertEqual(counts, {None: 1, '../LCK': 1, 'LCK': 1})
+            self.assertEqual([path.name for path in Path(tmpdir).iterdir()], ['leagues'])
+            self.assertEqual(len(list(directory.iterdir())), 3)
+
+    def test_close_twice(self):
+        sinks = {}
+        writer = sharding.ShardedWriter(lambda key: sinks.setdefault(key, ListSink()))
+        with writer:
+            writer.run(self.games[:10])
+        writer.close()
+        self.assertTrue(all(sink.closed for sink in sinks.values()))
+        self.assertEqual(sum(len(sink.games) for sink in sinks.values()), 10)
+
+        writer = sharding.ShardedWriter(lambda key: FailingSink(), batch_size=1)
+        with self.assertRaises(ValueError):
+            with writer:
+                writer.run(self.games)
+        writer.close()
+
+    def test_loader_sink(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            def make_sink(league):
+                connection = sqlite3.connect(Path(tmpdir, f'{league}.db'), check_same_thread=False)
+                self.addCleanup(connection.close)
+                backend = database.SqliteBackend(connection)
+                backend.create_tables()
+                return sharding.LoaderSink(database.Loader(backend, batch_size=50))
+            counts = sharding.ShardedWriter(make_sink).run(self.games)
+            for league, count in counts.items():
+                connection = sqlite3.connect(Path(tmpdir, f'{league}.db'))
+                self.assertEqual(connection.execute('SELECT COUNT(*) FROM games').fetchone()[0], count)
+                connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""This file contains code for testing the memory mapped snapshot format
+
+Running:
+- `python3 -m tests.test_snapshot`
+
+"""
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from lol_updater import iterfactory
+from lol_updater import snapshot
+
+from . import utils
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = Path(tmpdir.name, 'games.snap')
+        with open(utils.get_games_file_csv('games.csv'), 'r') as finput:
+            self.games = list(iterfactory.csv_game_iterator(datetime.min, finput))
+        # written newest first so that file order and date order differ
+        self.games.reverse()
+        snapshot.write_snapshot(self.games, self.path)
+
+    def test_round_trip(self):
+        with snapshot.Snapshot(self.path) as snap:
+            self.assertEqual(len(snap), len(self.games))
+            self.assertEqual(list(snap), self.games)
+
+    def test_get(self):
+        with snapshot.Snapshot(self.path) as snap:
+            for game in self.games:
+                self.assertEqual(snap.get(game.gameid), game)
+            self.assertIsNone(snap.get('missing'))
+
+    def test_between(self):
+        start = datetime(2022, 1, 14, 23)
+        end = datetime(2022, 1, 15, 1)
+        with snapshot.Snapshot(self.path) as snap:
+            games = list(snap.between(start, end))
+            self.assertEqual(len(list(snap.between())), len(self.games))
+        expected = sorted([g for g in self.games if start <= g.date < end], key=lambda g: g.date)
+        self.assertEqual(len(games), 2)
+        self.assertEqual(games, expected)
+
+    def test_bad_file(self):
+        self.path.write_bytes(b'not a snapshot' * 10)
+        with self.assertRaises(ValueError):
+            snapshot.Snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+"""This file contains code for testing the shared helpers of the package
+
+Running:
+- `python3 -m tests.test_utils`
+
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from lol_updater import utils
+
+
+class TestUtils(unittest.TestCase):
+
+    def test_atomic_write_json(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, 'state.json')
+            utils.atomic_write_json(path, dict(offset=1))
+            utils.atomic_write_json(path, dict(offset=2), indent=4)
+            self.assertEqual(json.loads(path.read_text()), dict(offset=2))
+            self.assertIn('\n    ', path.read_text())
+            self.assertEqual([child.name for child in Path(tmpdir).iterdir()], ['state.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
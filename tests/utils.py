@@ -1,9 +1,10 @@
 from typing import List, Dict
 from pathlib import Path
-
 import json
 import csv
 
+from lol_updater import testing
+
 FIXTURES_DIR = Path(__file__).parent / 'fixtures'
 OUTPUT_DIR = Path(__file__).parent / 'output'
 
@@ -64,3 +65,10 @@ def load_items(filename: str) -> List[Dict]:
     path = Path(FIXTURES_DIR, filename)
     with open(path, 'r') as finput:
         return json.load(finput)
+
+
+def serve_directory(directory=FIXTURES_DIR, handler=testing.QuietHandler):
+    '''
+    Serves the fixtures (or directory) over http for the duration of the block. Yields the base url
+    '''
+    return testing.serve_directory(directory, handler)